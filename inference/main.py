@@ -5,22 +5,32 @@ Self-contained with no backend dependencies
 """
 from fastapi import FastAPI, HTTPException, Depends, status
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, Field, PrivateAttr, field_validator, model_validator
 from typing import Optional, List, Dict, Any, Literal
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import json
 import logging
 import sys
+import threading
+import time
 from pathlib import Path
 from contextlib import asynccontextmanager
 from starlette.concurrency import run_in_threadpool
+import uvicorn
 
 # Import our self-contained config
 from config import config
 
 # Import standalone LLM processor (refactored modular version)
 from processors.llm_processor import LLMProcessor
+from processors.prompt_builder import MAX_HISTORY_TURNS
 
 # Import emotion detector
 from processors.emotion import EmotionDetector
+from processors.emotion_batcher import EmotionMicroBatcher
 
 # Import MCP client for web search
 from web_search.client import initialize_mcp, shutdown_mcp, get_mcp_client
@@ -45,8 +55,34 @@ llm_processor: Optional[LLMProcessor] = None
 emotion_detector: Optional[EmotionDetector] = None
 memory_service: Optional[MemoryService] = None
 
-# Cancellation tracking (request_id -> cancelled flag)
-cancelled_requests: set = set()
+# Emotion detection gets its own small pool so it never queues behind other threadpool work
+# (LLM generation is serialized on its own single thread inside LLMInference)
+emotion_executor: Optional[ThreadPoolExecutor] = None
+emotion_batcher: Optional[EmotionMicroBatcher] = None  # Coalesces concurrent /infer/emotion calls
+
+# Cancellation tracking (request_id -> expiry time, oldest first)
+cancelled_requests: "OrderedDict[str, float]" = OrderedDict()
+MAX_CANCELS = 4096  # Hard cap so cancel storms can't grow the registry unbounded
+CANCEL_TTL_SECONDS = 60  # Request should be done by then
+CANCEL_JANITOR_INTERVAL = 5
+
+# In-flight requests: request_id -> Event the LLM thread checks between tokens
+cancel_events: Dict[str, threading.Event] = {}
+
+
+async def _cancel_janitor():
+    """Periodically drop expired cancellation entries (single background task)."""
+    while True:
+        await asyncio.sleep(CANCEL_JANITOR_INTERVAL)
+        now = time.monotonic()
+        # Entries are kept in expiry order, so expired ones are always at the front
+        while cancelled_requests:
+            _, expires_at = next(iter(cancelled_requests.items()))
+            if expires_at > now:
+                break
+            cancelled_requests.popitem(last=False)
+            logger.debug("Cleaned up cancelled request")
+
 
 # ----------------------------------------------------------------------
 ## Lifespan Context Manager (Startup & Shutdown)
@@ -54,7 +90,7 @@ cancelled_requests: set = set()
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Handles startup and shutdown events."""
-    global llm_processor, emotion_detector, memory_service
+    global llm_processor, emotion_detector, memory_service, emotion_executor, emotion_batcher
 
     # ** STARTUP LOGIC **
     logger.info("=" * 60)
@@ -96,11 +132,22 @@ async def lifespan(app: FastAPI):
             # Initialize - this is an async method that loads the model
             await llm_processor.initialize()
             logger.info("✅ LLM Processor initialized.")
+
+            # Warm up: one-token generation pays first-prefill allocations / kernel setup now
+            try:
+                await llm_processor.generate_from_prompt(
+                    prompt="warmup", max_tokens=1, temperature=0.0,
+                    top_p=1.0, top_k=1, repeat_penalty=1.0, stop_sequences=[]
+                )
+                logger.info("✅ LLM warmup complete")
+            except Exception as e:
+                logger.warning(f"⚠️ LLM warmup failed (non-fatal): {e}")
     except Exception as e:
         logger.error(f"❌ Failed to initialize LLM Processor: {str(e)}", exc_info=True)
         llm_processor = None
 
     # 2. Initialize Emotion Detector
+    emotion_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="emotion")
     try:
         logger.info("Initializing Emotion Detector...")
         emotion_path = Path(config.emotion_model_path)
@@ -121,6 +168,18 @@ async def lifespan(app: FastAPI):
                 if hasattr(result, '__await__'):
                     await result
         logger.info("✅ Emotion Detector initialized.")
+
+        # Warm up: first forward pass loads lazy weights / kernels before real traffic
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                emotion_executor, emotion_detector.detect, "warmup"
+            )
+            logger.info("✅ Emotion warmup complete")
+        except Exception as e:
+            logger.warning(f"⚠️ Emotion warmup failed (non-fatal): {e}")
+
+        emotion_batcher = EmotionMicroBatcher(emotion_detector, executor=emotion_executor)
+        emotion_batcher.start()
     except Exception as e:
         logger.error(f"❌ Failed to initialize Emotion Detector: {e.__class__.__name__}: {str(e)}", exc_info=True)
         emotion_detector = None
@@ -141,6 +200,9 @@ async def lifespan(app: FastAPI):
     else:
         logger.info("⏭️  Web search disabled in config - skipping MCP Client initialization")
 
+    # 4. Start cancellation registry janitor
+    cancel_janitor_task = asyncio.create_task(_cancel_janitor())
+
     logger.info("=" * 60)
 
     yield
@@ -148,6 +210,11 @@ async def lifespan(app: FastAPI):
     # ** SHUTDOWN LOGIC **
     logger.info("Shutting down Inference Service")
 
+    cancel_janitor_task.cancel()
+    if emotion_batcher:
+        await emotion_batcher.stop()
+    emotion_executor.shutdown(wait=False)
+
     # Shutdown LLM processor and unload model
     try:
         if llm_processor and hasattr(llm_processor, 'cleanup'):
@@ -187,15 +254,16 @@ app = FastAPI(
     title="Inference Service",
     version="2.0.0",
     description="Self-contained ML inference microservice for LLM and Emotion detection",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse  # orjson encodes large history/text payloads much faster
 )
 
 app.add_middleware(
     CORSMiddleware,
     allow_origins=config.allowed_origins,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "DELETE"],  # Only the methods this service exposes
+    allow_headers=["content-type", "authorization"],
 )
 
 
@@ -208,6 +276,19 @@ class LLMInferenceRequest(BaseModel):
     repeat_penalty: Optional[float] = Field(default=1.1, ge=1.0, le=2.0)
     stop_sequences: Optional[List[str]] = Field(default=None)
 
+    @field_validator('prompt')
+    @classmethod
+    def _prompt_not_blank(cls, v: str) -> str:
+        """Reject whitespace-only prompts before they cost a full generation"""
+        if not v.strip():
+            raise ValueError('prompt must contain non-whitespace characters')
+        return v
+
+
+class LLMStreamInferenceRequest(LLMInferenceRequest):
+    """Request for streamed LLM generation (NDJSON, one chunk per line)"""
+    request_id: Optional[str] = None  # For cancellation tracking
+
 
 class LLMInferenceResponse(BaseModel):
     text: str
@@ -230,10 +311,31 @@ class LLMContextInferenceRequest(BaseModel):
     enable_web_search: Optional[bool] = False  # User preference for web search
     web_search_api_key: Optional[str] = None  # Brave Search API key from user settings
 
+    @field_validator('text')
+    @classmethod
+    def _text_not_blank(cls, v: str) -> str:
+        """Reject whitespace-only messages before they cost a full generation"""
+        if not v.strip():
+            raise ValueError('text must contain non-whitespace characters')
+        return v
+
+    _character_name: Optional[str] = PrivateAttr(default=None)
+
+    @model_validator(mode='after')
+    def _extract_character_name(self):
+        """Resolve the character name once at parse time (accepts snake_case or camelCase key)"""
+        profile = self.character_profile if isinstance(self.character_profile, dict) else {}
+        self._character_name = profile.get('character_name') or profile.get('characterName')
+        return self
+
 class EmotionInferenceRequest(BaseModel):
     text: str = Field(..., min_length=1, max_length=10000)
 
 
+class EmotionBatchInferenceRequest(BaseModel):
+    texts: List[str] = Field(..., min_length=1, max_length=64)
+
+
 class EmotionScore(BaseModel):
     label: str
     score: float
@@ -246,6 +348,23 @@ class EmotionInferenceResponse(BaseModel):
     category: Optional[str] = None
 
 
+class CancelRequest(BaseModel):
+    request_id: str
+    session_id: Optional[str] = None
+
+
+class SaveConversationRequest(BaseModel):
+    user_message: Optional[str] = ""
+    character_response: Optional[str] = ""
+    character_name: Optional[str] = "Unknown"
+    session_id: Optional[str] = "unknown"
+    emotion: Optional[str] = None
+
+
+class EmotionBatchInferenceResponse(BaseModel):
+    results: List[EmotionInferenceResponse]
+
+
 class HealthResponse(BaseModel):
     status: Literal["healthy", "degraded", "unavailable"]
     llm_loaded: bool
@@ -253,6 +372,40 @@ class HealthResponse(BaseModel):
     service_info: Dict[str, Any]
 
 
+# Formatted history responses keyed by (character, limit, offset) -> (monotonic time, response)
+# Polling UIs repeat identical requests; writes/deletes invalidate the affected character
+HISTORY_CACHE_TTL_SECONDS = 2.0
+HISTORY_CACHE_MAX_ENTRIES = 64  # Keys are client-controlled, so bound the cache
+_history_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+
+
+def _store_history_cache(cache_key: tuple, response: Dict[str, Any]):
+    """Cache a history response, dropping expired entries and the oldest beyond the size cap"""
+    now = time.monotonic()
+    _history_cache[cache_key] = (now, response)
+    _history_cache.move_to_end(cache_key)
+    # Entries are kept in insertion order, so expired ones are always at the front
+    while _history_cache and (
+        len(_history_cache) > HISTORY_CACHE_MAX_ENTRIES
+        or now - next(iter(_history_cache.values()))[0] >= HISTORY_CACHE_TTL_SECONDS
+    ):
+        _history_cache.popitem(last=False)
+
+
+def _invalidate_history_cache(character_name: Optional[str] = None):
+    """Drop cached history for one character (or everything when character_name is None)"""
+    if character_name is None:
+        _history_cache.clear()
+        return
+    for key in [key for key in _history_cache if key[0] == character_name]:
+        _history_cache.pop(key, None)
+
+
+# Health responses are cheap to serve but polled often - rebuild at most once a second
+HEALTH_CACHE_SECONDS = 1.0
+_cached_health: Optional[tuple] = None
+
+
 # ----------------------------------------------------------------------
 ## Dependency Injection
 # ----------------------------------------------------------------------
@@ -291,23 +444,25 @@ def get_emotion_detector() -> EmotionDetector:
 # ----------------------------------------------------------------------
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
-    """Health check endpoint"""
-    current_status: Literal["healthy", "degraded", "unavailable"] = "healthy"
+    """Health check endpoint (response rebuilt at most once per HEALTH_CACHE_SECONDS)"""
+    global _cached_health
+
+    now = time.monotonic()
+    if _cached_health is not None and now - _cached_health[0] < HEALTH_CACHE_SECONDS:
+        return _cached_health[1]
 
-    llm_ready = llm_processor is not None
-    if hasattr(llm_processor, 'initialized'):
-        llm_ready = llm_ready and llm_processor.initialized
+    current_status: Literal["healthy", "degraded", "unavailable"] = "healthy"
 
-    emotion_ready = emotion_detector is not None
-    if hasattr(emotion_detector, 'initialized'):
-        emotion_ready = emotion_ready and emotion_detector.initialized
+    # Both processors expose `initialized`, so no attribute probing is needed
+    llm_ready = llm_processor is not None and llm_processor.initialized
+    emotion_ready = emotion_detector is not None and emotion_detector.initialized
 
     if not llm_ready and not emotion_ready:
         current_status = "unavailable"
     elif not llm_ready or not emotion_ready:
         current_status = "degraded"
 
-    return HealthResponse(
+    response = HealthResponse(
         status=current_status,
         llm_loaded=llm_ready,
         emotion_loaded=emotion_ready,
@@ -318,6 +473,8 @@ async def health_check():
             "gpu_layers": config.llm_n_gpu_layers,
         }
     )
+    _cached_health = (now, response)
+    return response
 
 
 @app.post("/infer/llm", response_model=LLMInferenceResponse)
@@ -326,16 +483,15 @@ async def infer_llm(
     llm: LLMProcessor = Depends(get_llm_processor)
 ):
     """
-    Generate text using the LLM. Runs synchronously in a threadpool.
+    Generate text using the LLM. Runs on the dedicated single LLM thread.
     """
-    import time
     start_time = time.time()
 
     try:
         logger.info(f"LLM inference request: {len(request.prompt)} chars")
 
         # LLM generation is async
-        response_text = await llm.generate_response(
+        result = await llm.generate_from_prompt(
             prompt=request.prompt,
             max_tokens=request.max_tokens,
             temperature=request.temperature,
@@ -345,11 +501,12 @@ async def infer_llm(
             stop_sequences=request.stop_sequences or []
         )
 
+        response_text = result.get("text")
         if response_text is None or response_text.strip() == "":
             raise RuntimeError("LLM returned an empty or invalid response.")
 
-        # Approximate token count (not exact tokenization)
-        tokens_generated = len(response_text.split())
+        # Exact completion token count reported by llama.cpp
+        tokens_generated = result["tokens_generated"]
 
         elapsed = time.time() - start_time
         logger.info(f"✅ LLM inference completed in {elapsed:.2f}s ({tokens_generated} tokens)")
@@ -373,6 +530,64 @@ async def infer_llm(
         )
 
 
+@app.post("/infer/llm/stream")
+async def infer_llm_stream(
+    request: LLMStreamInferenceRequest,
+    llm: LLMProcessor = Depends(get_llm_processor)
+):
+    """
+    Stream LLM output as NDJSON so clients can render from the first token.
+    Each line is {"token": "..."}; the final line is {"done": true, ...}.
+    """
+    logger.info(f"LLM streaming request: {len(request.prompt)} chars")
+
+    async def ndjson_stream():
+        start_time = time.time()
+        chunks = 0
+        cancelled = False
+        cancel_event = threading.Event()
+        if request.request_id:
+            cancel_events[request.request_id] = cancel_event
+            # A /cancel that arrived before the stream started still stops it
+            if cancelled_requests.pop(request.request_id, None) is not None:
+                cancel_event.set()
+        stream = llm.generate_stream(
+            prompt=request.prompt,
+            max_tokens=request.max_tokens,
+            temperature=request.temperature,
+            top_p=request.top_p,
+            top_k=request.top_k,
+            repeat_penalty=request.repeat_penalty,
+            stop_sequences=request.stop_sequences or []
+        )
+        try:
+            async for token in stream:
+                if cancel_event.is_set():
+                    logger.info(f"🚫 Streaming request cancelled by client")
+                    cancelled = True
+                    break
+                chunks += 1
+                yield json.dumps({"token": token}) + "\n"
+        except Exception as e:
+            logger.error(f"LLM streaming error: {str(e)}", exc_info=True)
+            yield json.dumps({"error": f"{e.__class__.__name__} - {str(e)}"}) + "\n"
+            return
+        finally:
+            await stream.aclose()
+            if request.request_id:
+                cancel_events.pop(request.request_id, None)
+
+        elapsed = time.time() - start_time
+        logger.info(f"✅ LLM streaming completed in {elapsed:.2f}s ({chunks} chunks)")
+        yield json.dumps({
+            "done": True,
+            "stopped_early": cancelled,
+            "stop_reason": "cancelled" if cancelled else None
+        }) + "\n"
+
+    return StreamingResponse(ndjson_stream(), media_type="application/x-ndjson")
+
+
 @app.post("/infer/llm/context", response_model=LLMInferenceResponse)
 async def infer_llm_with_context(
     request: LLMContextInferenceRequest,
@@ -384,25 +599,22 @@ async def infer_llm_with_context(
 
     Uses FIFO (First In, First Out) processing - requests are handled sequentially.
     """
-    import time
     start_time = time.time()
+    cancel_event = threading.Event()
+    if request.request_id:
+        cancel_events[request.request_id] = cancel_event
 
     try:
         logger.info(f"Context-aware LLM inference request: {len(request.text)} chars")
 
-        # Check if request was already cancelled before starting
-        if request.request_id and request.request_id in cancelled_requests:
+        # Check if request was already cancelled before starting (single pop - no check-then-remove race)
+        if request.request_id and cancelled_requests.pop(request.request_id, None) is not None:
             logger.info(f"🚫 Request was cancelled before inference started")
-            cancelled_requests.discard(request.request_id)
             raise HTTPException(status_code=499, detail="Request cancelled by client")
 
-        # Extract character name from request (support both camelCase and snake_case)
-        character_name = None
-        if request.character_profile and isinstance(request.character_profile, dict):
-            character_name = (
-                request.character_profile.get('character_name') or
-                request.character_profile.get('characterName')
-            )
+        # Drop empty context early; PromptBuilder only ever uses the last MAX_HISTORY_TURNS messages
+        history = (request.conversation_history or [])[-MAX_HISTORY_TURNS:] or None
+        search = (request.search_context or "").strip() or None
 
         # Character loaded (logged at debug level without name)
 
@@ -410,13 +622,14 @@ async def infer_llm_with_context(
         result = await llm.generate_with_context(
             text=request.text,
             emotion_data=request.emotion_data,
-            conversation_history=request.conversation_history,
-            search_context=request.search_context,
+            conversation_history=history,
+            search_context=search,
             character_profile=request.character_profile,
             max_tokens_override=request.max_tokens_override,
             temperature_override=request.temperature_override,
-            character_name=character_name,  # Explicitly pass character name
-            request_id=request.request_id,  # Pass for cancellation checking
+            character_name=request._character_name,  # Resolved once by the request validator
+            request_id=request.request_id,
+            cancel_event=cancel_event,  # Set by /cancel, checked between tokens
             enable_memory=request.enable_memory,  # User preference for memory retrieval
             enable_web_search=request.enable_web_search,  # User preference for web search
             web_search_api_key=request.web_search_api_key  # Brave Search API key
@@ -446,6 +659,9 @@ async def infer_llm_with_context(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Context-aware LLM inference failed: {e.__class__.__name__} - {str(e)}"
         )
+    finally:
+        if request.request_id:
+            cancel_events.pop(request.request_id, None)
 
 
 @app.post("/infer/emotion", response_model=EmotionInferenceResponse)
@@ -454,13 +670,18 @@ async def infer_emotion(
     detector: EmotionDetector = Depends(get_emotion_detector)
 ):
     """
-    Detect emotion in text. Runs synchronously in a threadpool.
+    Detect emotion in text. Runs on the emotion executor.
     """
     try:
         logger.info(f"Emotion inference request: {len(request.text)} chars")
 
-        # Run the synchronous method in a threadpool
-        result = await run_in_threadpool(detector.detect, request.text)
+        # Concurrent requests are coalesced into one batched classifier call
+        if emotion_batcher:
+            result = await emotion_batcher.detect(request.text)
+        else:
+            result = await asyncio.get_running_loop().run_in_executor(
+                emotion_executor, detector.detect, request.text
+            )
 
         return EmotionInferenceResponse(
             label=result.get("label"),
@@ -480,41 +701,76 @@ async def infer_emotion(
         )
 
 
+@app.post("/infer/emotion/batch", response_model=EmotionBatchInferenceResponse)
+async def infer_emotion_batch(
+    request: EmotionBatchInferenceRequest,
+    detector: EmotionDetector = Depends(get_emotion_detector)
+):
+    """
+    Detect emotion for up to 64 texts with a single batched classifier call.
+    """
+    try:
+        logger.info(f"Emotion batch inference request: {len(request.texts)} texts")
+
+        results = await asyncio.get_running_loop().run_in_executor(
+            emotion_executor, detector.detect_batch, request.texts
+        )
+
+        return EmotionBatchInferenceResponse(
+            results=[
+                EmotionInferenceResponse(
+                    label=result.get("label"),
+                    score=result.get("score"),
+                    top_emotions=result.get("top_emotions", []),
+                    intensity=result.get("intensity"),
+                    category=result.get("category")
+                )
+                for result in results
+            ]
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Emotion batch inference error: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Emotion batch inference failed: {e.__class__.__name__} - {str(e)}"
+        )
+
+
 # ----------------------------------------------------------------------
 ## Request Cancellation Endpoint
 # ----------------------------------------------------------------------
 @app.post("/cancel")
-async def cancel_request(request: Dict[str, Any]):
+async def cancel_request(request: CancelRequest):
     """
     Cancel an in-flight inference request to free up LLM resources.
 
     Args:
-        request: Dict with 'session_id' and 'request_id'
+        request: CancelRequest with 'request_id' (and optional 'session_id')
 
     Returns:
         Success status
     """
-    global cancelled_requests
-
-    session_id = request.get('session_id')
-    request_id = request.get('request_id')
+    request_id = request.request_id
 
     if not request_id:
         raise HTTPException(status_code=400, detail="request_id is required")
 
-    # Add to cancelled set
-    cancelled_requests.add(request_id)
+    # Stop an in-flight generation at its next token
+    cancel_event = cancel_events.get(request_id)
+    if cancel_event is not None:
+        cancel_event.set()
+
+    # Also remember the ID in case the request hasn't reached inference yet
+    # (expired entries are dropped by _cancel_janitor)
+    cancelled_requests[request_id] = time.monotonic() + CANCEL_TTL_SECONDS
+    cancelled_requests.move_to_end(request_id)
+    while len(cancelled_requests) > MAX_CANCELS:
+        cancelled_requests.popitem(last=False)
     logger.info(f"🚫 Request marked for cancellation")
 
-    # Auto-cleanup after 60 seconds (request should be done by then)
-    async def cleanup():
-        await asyncio.sleep(60)
-        cancelled_requests.discard(request_id)
-        logger.debug(f"Cleaned up cancelled request")
-
-    # Fire and forget cleanup
-    asyncio.create_task(cleanup())
-
     return {
         "status": "cancelled",
         "request_id": request_id,
@@ -525,27 +781,30 @@ async def cancel_request(request: Dict[str, Any]):
 @app.post("/clear_character_cache")
 async def clear_character_cache_endpoint(request: Dict[str, Any]):
     """
-    Clear cached data for a specific character.
+    Clear cached character data.
     Call this after updating a character's profile to ensure
     avoid words and other settings are reloaded.
 
+    The character caches are bounded LRUs (64 entries each), so this is only
+    needed for freshness, never to reclaim memory.
+
     Args:
-        request: Dict with 'character_name'
+        request: Dict with optional 'character_name' (omit to clear every character)
 
     Returns:
         Success status
     """
     character_name = request.get('character_name')
 
-    if not character_name:
-        raise HTTPException(status_code=400, detail="character_name is required")
-
     try:
-        llm_processor.clear_character_cache(character_name)
+        if character_name:
+            llm_processor.clear_character_cache(character_name)
+        else:
+            llm_processor.clear_all_character_caches()
         return {
             "status": "success",
             "character_name": character_name,
-            "message": f"Cache cleared for character: {character_name}"
+            "message": f"Cache cleared for character: {character_name}" if character_name else "All character caches cleared"
         }
     except Exception as e:
         logger.error(f"Failed to clear cache for {character_name}: {e}")
@@ -556,7 +815,7 @@ async def clear_character_cache_endpoint(request: Dict[str, Any]):
 ## MCP Integration Endpoints
 # ----------------------------------------------------------------------
 @app.post("/mcp/save_conversation")
-async def save_conversation_to_memory(request: Dict[str, Any]):
+async def save_conversation_to_memory(request: SaveConversationRequest):
     """
     Save conversation to persistent vector memory.
     Returns success even if memory is unavailable (graceful degradation).
@@ -570,32 +829,38 @@ async def save_conversation_to_memory(request: Dict[str, Any]):
                 "message": "Memory not available - conversation saved to session only"
             }
 
+        character_name = request.character_name or "Unknown"
+        session_id = request.session_id or "unknown"
+        messages = []
+
         # Store user message (skip system messages)
-        user_message = request.get("user_message", "")
-        is_system_message = user_message.strip().startswith("[System:")
-
-        user_msg_id = None
-        if not is_system_message:
-            user_msg_id = memory_service.store_message(
-                message=user_message,
-                character=request.get("character_name", "Unknown"),
-                speaker="User",
-                session_id=request.get("session_id", "unknown"),
-                emotion=request.get("emotion")
-            )
+        user_message = request.user_message or ""
+        if not user_message.strip().startswith("[System:"):
+            messages.append({
+                "message": user_message,
+                "character": character_name,
+                "speaker": "User",
+                "session_id": session_id,
+                "emotion": request.emotion
+            })
         else:
             logger.debug("Skipping system message from memory storage")
 
         # Store character response
-        char_msg_id = memory_service.store_message(
-            message=request.get("character_response", ""),
-            character=request.get("character_name", "Unknown"),
-            speaker=request.get("character_name", "Unknown"),
-            session_id=request.get("session_id", "unknown")
-        )
+        messages.append({
+            "message": request.character_response or "",
+            "character": character_name,
+            "speaker": character_name,
+            "session_id": session_id
+        })
+
+        # Single batched write (one embedding pass + one Chroma insert)
+        # ChromaDB is synchronous - run it off the event loop
+        stored_ids = await run_in_threadpool(memory_service.store_messages_batch, messages)
+        _invalidate_history_cache(character_name)
 
-        if user_msg_id and char_msg_id:
-            logger.debug(f"Saved conversation to vector memory: {user_msg_id}, {char_msg_id}")
+        if len(stored_ids) == len(messages):
+            logger.debug(f"Saved conversation to vector memory: {', '.join(stored_ids)}")
             return {"status": "success", "message": "Conversation saved to vector memory"}
         else:
             logger.warning("Failed to save conversation to vector memory")
@@ -629,11 +894,12 @@ async def delete_all_conversations():
             }
 
         # Get stats before deletion
-        stats = memory_service.get_stats()
+        stats = await run_in_threadpool(memory_service.get_stats)
         total_count = stats.get("total_messages", 0)
 
         # Delete all memories
-        success = memory_service.delete_all()
+        success = await run_in_threadpool(memory_service.delete_all)
+        _invalidate_history_cache()
 
         if success:
             logger.info(f"Deleted {total_count} messages from vector memory")
@@ -681,23 +947,22 @@ async def get_conversation_history(
                 "total": 0
             }
 
+        cache_key = (character_name, limit, offset)
+        cached = _history_cache.get(cache_key)
+        if cached is not None and time.monotonic() - cached[0] < HISTORY_CACHE_TTL_SECONDS:
+            return cached[1]
+
         # Get messages from memory service
-        messages = memory_service.get_messages(
+        messages = await run_in_threadpool(
+            memory_service.get_messages,
             character=character_name,
             limit=limit,
             offset=offset
         )
 
-        # Sort by timestamp (most recent first)
-        sorted_messages = sorted(
-            messages,
-            key=lambda m: m.get('metadata', {}).get('timestamp', ''),
-            reverse=True
-        )
-
-        # Format for frontend
+        # Format for frontend (memory service already returns most recent first)
         formatted_messages = []
-        for msg in sorted_messages:
+        for msg in messages:
             metadata = msg.get('metadata', {})
             formatted_messages.append({
                 "speaker": metadata.get('speaker', 'Unknown'),
@@ -708,12 +973,14 @@ async def get_conversation_history(
             })
 
         logger.info(f"Retrieved {len(formatted_messages)} messages")
-        return {
+        response = {
             "status": "success",
             "character": character_name,
             "messages": formatted_messages,
             "total": len(formatted_messages)
         }
+        _store_history_cache(cache_key, response)
+        return response
 
     except Exception as e:
         logger.error(f"Error retrieving conversation history: {str(e)}", exc_info=True)
@@ -740,11 +1007,12 @@ async def delete_character_conversations(character_name: str):
             }
 
         # Get stats before deletion
-        stats = memory_service.get_stats(character=character_name)
+        stats = await run_in_threadpool(memory_service.get_stats, character=character_name)
         count = stats.get("characters", {}).get(character_name, 0)
 
         # Delete character memories
-        success = memory_service.delete_character_memories(character_name)
+        success = await run_in_threadpool(memory_service.delete_character_memories, character_name)
+        _invalidate_history_cache(character_name)
 
         if success:
             logger.info(f"Deleted {count} messages")
@@ -766,7 +1034,6 @@ async def delete_character_conversations(character_name: str):
 
 
 if __name__ == "__main__":
-    import uvicorn
 
     logger.info(f"Starting server on {config.host}:{config.port}")
 
@@ -775,5 +1042,9 @@ if __name__ == "__main__":
         host=config.host,
         port=config.port,
         reload=config.reload,
-        log_level=config.log_level
+        log_level=config.log_level,
+        # libuv event loop + httptools parser (both ship with uvicorn[standard]); uvloop has no Windows build
+        loop="uvloop" if sys.platform != "win32" else "asyncio",
+        http="httptools",
+        workers=1  # One process - each worker would load its own copy of the LLM
     )
\ No newline at end of file
@@ -0,0 +1,209 @@
+"""
+FAISS Hot-Tier Memory Store
+In-process inner-product index per character, layered in front of ChromaDB.
+
+ChromaDB stays the persistent source of truth (and already stores the MiniLM
+embeddings it computes); this store keeps an in-memory FAISS index per character
+so recall queries are a single SIMD dot-product scan instead of a Chroma query.
+"""
+import logging
+import threading
+from typing import List, Dict, Optional, Any, Tuple
+
+import numpy as np
+
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:  # Optional dependency - MemoryService falls back to ChromaDB queries
+    faiss = None
+    FAISS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# all-MiniLM-L6-v2 (ChromaDB's default embedding function) output size
+EMBEDDING_DIM = 384
+
+# Once a character has this many vectors, switch from fp32 IndexFlatIP to an 8-bit
+# scalar-quantized index (4x smaller rows). The quantizer is trained once on these vectors.
+SQ_TRAIN_THRESHOLD = 1000
+
+
+class _CharacterIndex:
+    """FAISS index plus row-aligned message data for one character"""
+
+    __slots__ = ("index", "rows", "quantized")
+
+    def __init__(self, dim: int):
+        self.index = faiss.IndexFlatIP(dim)
+        self.rows: List[Dict[str, Any]] = []  # rows[i] <-> FAISS row id i
+        self.quantized = False
+
+    def maybe_quantize(self, dim: int) -> None:
+        """Swap the flat index for a trained int8 IndexScalarQuantizer once it is large enough"""
+        if self.quantized or self.index.ntotal < SQ_TRAIN_THRESHOLD:
+            return
+
+        vectors = self.index.reconstruct_n(0, self.index.ntotal)
+        sq_index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT)
+        sq_index.train(vectors)
+        sq_index.add(vectors)
+
+        self.index = sq_index
+        self.quantized = True
+        logger.debug(f"Quantized FAISS hot index to int8 ({sq_index.ntotal} vectors)")
+
+
+class FAISSMemoryStore:
+    """
+    Per-character FAISS inner-product index over L2-normalized embeddings (inner product = cosine).
+    Small indexes are exact fp32 IndexFlatIP; large ones become int8 IndexScalarQuantizer.
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        if not FAISS_AVAILABLE:
+            raise RuntimeError("faiss is not installed")
+
+        self.dim = dim
+        self._indexes: Dict[str, _CharacterIndex] = {}
+        # Characters whose index is being built from a ChromaDB snapshot -> batches added meanwhile
+        self._pending: Dict[str, List[Tuple]] = {}
+        # Memory calls arrive from the threadpool, so adds/searches/drops can overlap
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(embeddings) -> np.ndarray:
+        """Convert to a contiguous float32 matrix with unit-length rows"""
+        vectors = np.ascontiguousarray(np.asarray(embeddings, dtype=np.float32).reshape(len(embeddings), -1))
+        faiss.normalize_L2(vectors)
+        return vectors
+
+    def has(self, character: str) -> bool:
+        """Whether this character's index has been loaded"""
+        return character in self._indexes
+
+    def begin_load(self, character: str) -> Optional[List[Tuple]]:
+        """
+        Mark a character's index as loading. Call before snapshotting ChromaDB for load(), so
+        messages stored while the snapshot is read are buffered instead of skipped by add().
+
+        Returns:
+            Load token to pass to load() (None if the index is already loaded)
+        """
+        with self._lock:
+            if character in self._indexes:
+                return None
+            return self._pending.setdefault(character, [])
+
+    def load(self, character: str, ids: List[str], documents: List[str],
+             metadatas: List[Dict], embeddings, token: Optional[List[Tuple]]) -> None:
+        """
+        (Re)build a character's index from rows already stored in ChromaDB.
+
+        Batches buffered since begin_load() are merged in, skipping IDs the snapshot already has.
+        If the character was dropped (or another load finished) since begin_load(), the snapshot
+        is discarded.
+
+        Args:
+            character: Character name
+            ids: Message IDs
+            documents: Message texts
+            metadatas: Message metadata dicts
+            embeddings: Stored embeddings (one per message)
+            token: What begin_load() returned before the snapshot was read
+        """
+        char_index = _CharacterIndex(self.dim)
+        if len(ids):
+            char_index.index.add(self._normalize(embeddings))
+            char_index.rows = [
+                {"id": msg_id, "message": doc, "metadata": meta or {}}
+                for msg_id, doc, meta in zip(ids, documents, metadatas)
+            ]
+            char_index.maybe_quantize(self.dim)
+
+        with self._lock:
+            if token is None or self._pending.get(character) is not token:
+                return
+            loaded = set(ids)
+            for batch_ids, batch_documents, batch_metadatas, batch_embeddings in self._pending.pop(character):
+                keep = [i for i, msg_id in enumerate(batch_ids) if msg_id not in loaded]
+                if not keep:
+                    continue
+                char_index.index.add(self._normalize([batch_embeddings[i] for i in keep]))
+                char_index.rows.extend(
+                    {"id": batch_ids[i], "message": batch_documents[i], "metadata": batch_metadatas[i] or {}}
+                    for i in keep
+                )
+            char_index.maybe_quantize(self.dim)
+            self._indexes[character] = char_index
+
+        logger.debug(f"Loaded FAISS hot index with {len(char_index.rows)} messages")
+
+    def add(self, character: str, ids: List[str], documents: List[str],
+            metadatas: List[Dict], embeddings) -> None:
+        """
+        Append newly stored messages to a loaded character index.
+        Characters being loaded buffer the batch for load(); unloaded ones are skipped -
+        they are rebuilt from ChromaDB on first search.
+        """
+        with self._lock:
+            char_index = self._indexes.get(character)
+            if char_index is None:
+                if character in self._pending:
+                    self._pending[character].append((ids, documents, metadatas, embeddings))
+                return
+            char_index.index.add(self._normalize(embeddings))
+            char_index.rows.extend(
+                {"id": msg_id, "message": doc, "metadata": meta or {}}
+                for msg_id, doc, meta in zip(ids, documents, metadatas)
+            )
+            char_index.maybe_quantize(self.dim)
+
+    def search(self, character: str, query_embedding, n_results: int = 5,
+               filter_metadata: Optional[Dict] = None) -> List[Dict]:
+        """
+        Top-k inner-product search.
+
+        Args:
+            character: Character name (index must be loaded)
+            query_embedding: Query embedding
+            n_results: How many results to return
+            filter_metadata: Optional exact-match metadata filters
+
+        Returns:
+            List of {"id", "message", "metadata", "score"} (score = cosine similarity)
+        """
+        with self._lock:
+            char_index = self._indexes.get(character)
+            if char_index is None or char_index.index.ntotal == 0:
+                return []
+
+            # With a filter, scan everything (N is small) and filter afterwards
+            k = char_index.index.ntotal if filter_metadata else min(n_results, char_index.index.ntotal)
+            scores, row_ids = char_index.index.search(self._normalize([query_embedding]), k)
+            rows = char_index.rows
+
+        results = []
+        for score, row_id in zip(scores[0], row_ids[0]):
+            if row_id < 0:
+                continue
+            row = rows[row_id]
+            if filter_metadata and any(row["metadata"].get(key) != value for key, value in filter_metadata.items()):
+                continue
+            results.append({**row, "score": float(score)})
+            if len(results) >= n_results:
+                break
+
+        return results
+
+    def drop(self, character: str) -> None:
+        """Forget a character's index (rebuilt from ChromaDB on next search)"""
+        with self._lock:
+            self._indexes.pop(character, None)
+            self._pending.pop(character, None)  # An in-flight load may hold deleted rows
+
+    def clear(self) -> None:
+        """Forget all indexes"""
+        with self._lock:
+            self._indexes.clear()
+            self._pending.clear()
@@ -1,23 +1,50 @@
 """
 Vector Memory Service
 
-Local memory for conversation recall using ChromaDB with keyword-based search.
+Local memory for conversation recall using ChromaDB with embedding-based search.
 100% private, GDPR-compliant, fully deletable.
 
-This replaces the MCP memory server with keyword-based search (no embedding models needed).
+This replaces the MCP memory server. Embeddings come from ChromaDB's default embedding
+function (no sentence-transformers model to load).
 """
 import chromadb
 from chromadb.config import Settings
 from datetime import datetime
 import uuid
-from typing import List, Dict, Optional
+import time
+import bisect
+import threading
+from typing import List, Dict, Optional, Tuple
 import logging
 from pathlib import Path
 import gc  # For explicit garbage collection
 import re
 
+from .faiss_store import FAISSMemoryStore, FAISS_AVAILABLE
+
 logger = logging.getLogger(__name__)
 
+# How many of a character's newest messages get_messages() can page through without a full scan
+RECENT_INDEX_SIZE = 500
+
+
+class _RecentIndex:
+    """Sort keys of one character's newest messages, oldest first: (ts_ns, ISO timestamp, id)"""
+
+    __slots__ = ("keys", "seeded", "truncated")
+
+    def __init__(self):
+        self.keys: List[Tuple[int, str, str]] = []
+        self.seeded = False  # Set once the keys already in ChromaDB have been merged in
+        self.truncated = False  # Older messages exist that are not in keys
+
+    def add(self, keys) -> None:
+        for key in keys:
+            bisect.insort(self.keys, key)
+        if len(self.keys) > RECENT_INDEX_SIZE:
+            del self.keys[:len(self.keys) - RECENT_INDEX_SIZE]
+            self.truncated = True
+
 
 class MemoryService:
     """
@@ -49,16 +76,24 @@ class MemoryService:
         self.embedding_cache = {}
         self.cache_max_size = 500  # Reduced from 1000 to minimize memory usage
 
+        # Optional FAISS hot tier in front of ChromaDB (uses Chroma's own MiniLM embeddings)
+        self.hot_store: Optional[FAISSMemoryStore] = None
+        self.embedding_function = None
+
+        # Newest-message keys per character, so get_messages() pages don't load every row
+        self._recent: Dict[str, _RecentIndex] = {}
+        self._recent_lock = threading.Lock()
+
         logger.info("MemoryService created (not yet initialized)")
 
     async def initialize(self):
-        """Async initialization of ChromaDB (no embedding model needed)."""
+        """Async initialization of ChromaDB (its default embedding function loads on first use)."""
         if self.initialized:
             logger.info("MemoryService already initialized")
             return
 
         try:
-            logger.info("Initializing Memory Service (keyword-based search)...")
+            logger.info("Initializing Memory Service (embedding-based search)...")
 
             # Initialize ChromaDB with persistent storage (LOCAL ONLY - NO NETWORK EXPOSURE)
             logger.info("Initializing ChromaDB with persistent storage...")
@@ -72,12 +107,18 @@ class MemoryService:
                 )
             )
 
-            # No embedding model needed - using keyword-based search
-            logger.info("Using keyword-based search (no embedding model required)")
+            # FAISS hot tier: embed once with Chroma's default function, store the vectors in
+            # Chroma, and search them in-process
+            if FAISS_AVAILABLE:
+                from chromadb.utils import embedding_functions
+                self.embedding_function = embedding_functions.DefaultEmbeddingFunction()
+                self.hot_store = FAISSMemoryStore()
+                logger.info("   - Hot tier: FAISS in-memory index enabled")
 
             self.initialized = True
             logger.info("✅ Memory Service initialized successfully")
-            logger.info("   - Search method: Keyword-based (fast, no model downloads)")
+            logger.info("   - Search method: Embedding-based (Chroma default embedding function; "
+                        "its ONNX model downloads on first use)")
             logger.info("   - Storage: Persistent local storage")
             logger.info("   - Telemetry: DISABLED (privacy-first)")
 
@@ -167,9 +208,6 @@ class MemoryService:
             return None
 
         try:
-            # No embedding needed for keyword-based search
-            # Store the message text directly for keyword matching
-
             # Get or create collection for this character
             collection_name = self._get_collection_name(character)
             collection = self.client.get_or_create_collection(
@@ -184,6 +222,7 @@ class MemoryService:
             msg_metadata = {
                 "speaker": speaker,
                 "timestamp": datetime.now().isoformat(),
+                "ts_ns": time.time_ns(),  # Numeric timestamp for cheap ordering
                 "character": character,
                 "session_id": session_id,
             }
@@ -195,12 +234,8 @@ class MemoryService:
             if metadata:
                 msg_metadata.update(metadata)
 
-            # Store in ChromaDB (no embeddings, just documents for keyword search)
-            collection.add(
-                ids=[msg_id],
-                documents=[message],
-                metadatas=[msg_metadata]
-            )
+            # Store in ChromaDB (and the FAISS hot tier when enabled)
+            self._add_to_collection(collection, character, [msg_id], [message], [msg_metadata])
 
             logger.debug(f"Stored message {msg_id}")
             return msg_id
@@ -209,6 +244,136 @@ class MemoryService:
             logger.error(f"Failed to store message: {e}", exc_info=True)
             return None
 
+    def _add_to_collection(self, collection, character: str, ids: List[str],
+                           documents: List[str], metadatas: List[Dict]):
+        """
+        Add documents to a Chroma collection, mirroring them into the FAISS hot tier and the
+        recent-message keys.
+
+        When the hot tier is enabled the embeddings are computed here once and handed to
+        Chroma, so the same vectors back both the persistent store and the in-memory index.
+        """
+        if self.hot_store is None:
+            collection.add(ids=ids, documents=documents, metadatas=metadatas)
+        else:
+            embeddings = self.embedding_function(documents)
+            collection.add(ids=ids, documents=documents, metadatas=metadatas, embeddings=embeddings)
+            self.hot_store.add(character, ids, documents, metadatas, embeddings)
+
+        with self._recent_lock:
+            recent = self._recent.get(character)
+            if recent is not None:
+                recent.add(self._recent_key(msg_id, meta) for msg_id, meta in zip(ids, metadatas))
+
+    @staticmethod
+    def _recent_key(msg_id: str, metadata: Optional[Dict]) -> Tuple[int, str, str]:
+        """Recency sort key - ts_ns, with the ISO timestamp as fallback for legacy rows without it"""
+        metadata = metadata or {}
+        return (metadata.get('ts_ns') or 0, metadata.get('timestamp', ''), msg_id)
+
+    def _forget_recent(self, character: Optional[str] = None):
+        """Drop one character's recent-message keys (all characters if None)"""
+        with self._recent_lock:
+            if character is None:
+                self._recent.clear()
+            else:
+                self._recent.pop(character, None)
+
+    def _recent_page_ids(self, collection, character: str, limit: int, offset: int) -> Optional[List[str]]:
+        """
+        Message IDs for one get_messages() page, newest first, from the recent-message keys.
+        The keys are seeded from ChromaDB metadata once per character and kept current on store.
+
+        Returns:
+            Page IDs, or None if the page reaches past the messages the keys cover
+        """
+        with self._recent_lock:
+            recent = self._recent.get(character)
+            if recent is None:
+                recent = self._recent[character] = _RecentIndex()
+
+        if not recent.seeded:
+            # Register before snapshotting (above) so messages stored meanwhile are not missed
+            stored = collection.get(include=["metadatas"])
+            with self._recent_lock:
+                if self._recent.get(character) is not recent:
+                    return None  # Deleted from meanwhile - use the full scan this time
+                if not recent.seeded:
+                    known = set(recent.keys)
+                    recent.add(
+                        key for key in map(self._recent_key, stored['ids'], stored['metadatas'])
+                        if key not in known
+                    )
+                    recent.seeded = True
+
+        with self._recent_lock:
+            end = len(recent.keys) - offset
+            if recent.truncated and end - limit < 0:
+                return None
+            return [key[2] for key in reversed(recent.keys[max(end - limit, 0):max(end, 0)])]
+
+    def store_messages_batch(self, messages: List[Dict]) -> List[str]:
+        """
+        Store several messages with one ChromaDB add() call per character.
+
+        Chroma embeds all documents of a single add() in one pass, so batching
+        a conversation turn halves embedding passes and write round-trips
+        compared to calling store_message() per message.
+
+        Args:
+            messages: List of dicts with the same keys as store_message()
+                      (message, character, speaker, session_id, emotion, metadata)
+
+        Returns:
+            List of stored message IDs (empty/whitespace messages are skipped)
+        """
+        if not self.initialized:
+            logger.warning("MemoryService not initialized, cannot store messages")
+            return []
+
+        # Group by character so each collection gets a single add()
+        batches: Dict[str, Dict[str, list]] = {}
+        for msg in messages:
+            message = msg.get("message")
+            if not message or not message.strip():
+                logger.warning("Empty message, skipping storage")
+                continue
+
+            character = msg["character"]
+            msg_metadata = {
+                "speaker": msg["speaker"],
+                "timestamp": datetime.now().isoformat(),
+                "ts_ns": time.time_ns(),
+                "character": character,
+                "session_id": msg["session_id"],
+            }
+            if msg.get("emotion"):
+                msg_metadata["emotion"] = msg["emotion"]
+            if msg.get("metadata"):
+                msg_metadata.update(msg["metadata"])
+
+            batch = batches.setdefault(character, {"ids": [], "documents": [], "metadatas": []})
+            batch["ids"].append(f"msg_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}")
+            batch["documents"].append(message)
+            batch["metadatas"].append(msg_metadata)
+
+        stored_ids = []
+        for character, batch in batches.items():
+            try:
+                collection = self.client.get_or_create_collection(
+                    name=self._get_collection_name(character),
+                    metadata={"character": character}
+                )
+                self._add_to_collection(
+                    collection, character, batch["ids"], batch["documents"], batch["metadatas"]
+                )
+                stored_ids.extend(batch["ids"])
+                logger.debug(f"Stored {len(batch['ids'])} messages in one batch")
+            except Exception as e:
+                logger.error(f"Failed to store message batch: {e}", exc_info=True)
+
+        return stored_ids
+
     def semantic_search(
         self,
         query: str,
@@ -217,10 +382,13 @@ class MemoryService:
         filter_metadata: Optional[Dict] = None
     ) -> List[Dict]:
         """
-        Search for keyword matches in messages (no embeddings needed).
+        Search for semantically similar messages by embedding similarity.
+
+        Uses the FAISS hot tier when it is enabled and the filter is simple; otherwise
+        queries ChromaDB, which embeds the query with its default embedding function.
 
         Args:
-            query: Search query (keywords to match)
+            query: Search query (embedded and compared against stored messages)
             character: Which character's memories to search
             n_results: How many results to return (default: 5)
             filter_metadata: Optional metadata filters (e.g., {"emotion": "happy"})
@@ -236,7 +404,7 @@ class MemoryService:
             return []
 
         try:
-            logger.debug(f"Starting keyword search for query: '{query[:50]}...'")
+            logger.debug(f"Starting semantic search for query: '{query[:50]}...'")
 
             # Get character's collection
             collection_name = self._get_collection_name(character)
@@ -249,9 +417,14 @@ class MemoryService:
                 logger.info(f"No memories found for {character}")
                 return []
 
-            # Use ChromaDB's built-in text search (no embeddings)
-            # This does simple keyword/substring matching
-            logger.debug("Querying collection with keyword search...")
+            # Hot path: in-process FAISS scan (exact-match filters only)
+            if self.hot_store is not None and self._is_simple_filter(filter_metadata):
+                formatted = self._hot_search(collection, query, character, n_results, filter_metadata)
+                logger.debug(f"Found {len(formatted)} similar memories (FAISS) for query: '{query[:50]}...'")
+                return formatted
+
+            # ChromaDB vector query (the query text is embedded with the collection's embedding function)
+            logger.debug("Querying collection with semantic search...")
             results = collection.query(
                 query_texts=[query],
                 n_results=n_results,
@@ -277,6 +450,42 @@ class MemoryService:
             logger.error(f"Semantic search failed: {e}", exc_info=True)
             return []
 
+    @staticmethod
+    def _is_simple_filter(filter_metadata: Optional[Dict]) -> bool:
+        """True if the filter is absent or only {field: scalar} equality checks"""
+        if not filter_metadata:
+            return True
+        return all(
+            not key.startswith("$") and isinstance(value, (str, int, float, bool))
+            for key, value in filter_metadata.items()
+        )
+
+    def _hot_search(self, collection, query: str, character: str, n_results: int,
+                    filter_metadata: Optional[Dict]) -> List[Dict]:
+        """Search the FAISS hot tier, loading the character's stored vectors from Chroma on first use"""
+        if not self.hot_store.has(character):
+            # Register first, so messages stored while the snapshot is read are not lost to the index
+            token = self.hot_store.begin_load(character)
+            stored = collection.get(include=["documents", "metadatas", "embeddings"])
+            self.hot_store.load(
+                character, stored['ids'], stored['documents'], stored['metadatas'], stored['embeddings'], token
+            )
+
+        query_embedding = self.embedding_function([query])[0]
+        hits = self.hot_store.search(character, query_embedding, n_results, filter_metadata)
+
+        # Report similarity on the same scale as the Chroma path: Chroma's default L2 distance
+        # on unit vectors is 2 - 2*cos, so 1 - distance == 2*cos - 1
+        return [
+            {
+                "id": hit["id"],
+                "message": hit["message"],
+                "similarity": 2 * hit["score"] - 1,
+                "metadata": hit["metadata"]
+            }
+            for hit in hits
+        ]
+
     def delete_messages(self, character: str, message_ids: List[str]) -> bool:
         """
         HARD DELETE - GDPR compliant permanent removal.
@@ -298,6 +507,9 @@ class MemoryService:
 
             # Hard delete (not soft delete)
             collection.delete(ids=message_ids)
+            if self.hot_store is not None:
+                self.hot_store.drop(character)
+            self._forget_recent(character)
 
             logger.info(f"✅ Deleted {len(message_ids)} messages")
             return True
@@ -342,6 +554,9 @@ class MemoryService:
 
             if results['ids']:
                 collection.delete(ids=results['ids'])
+                if self.hot_store is not None:
+                    self.hot_store.drop(character)
+                self._forget_recent(character)
                 count = len(results['ids'])
                 logger.info(f"Deleted {count} messages from {start_date} to {end_date}")
                 return count
@@ -368,6 +583,9 @@ class MemoryService:
         try:
             collection_name = self._get_collection_name(character)
             self.client.delete_collection(name=collection_name)
+            if self.hot_store is not None:
+                self.hot_store.drop(character)
+            self._forget_recent(character)
 
             logger.info(f"✅ Deleted all memories")
             return True
@@ -390,6 +608,9 @@ class MemoryService:
             collections = self.client.list_collections()
             for collection in collections:
                 self.client.delete_collection(name=collection.name)
+            if self.hot_store is not None:
+                self.hot_store.clear()
+            self._forget_recent()
 
             logger.info(f"✅ Deleted all memories ({len(collections)} collections)")
             return True
@@ -444,6 +665,7 @@ class MemoryService:
     ) -> List[Dict]:
         """
         Get recent messages for a character (for export/viewing).
+        Returns messages sorted by timestamp (most recent first).
 
         Args:
             character: Character name
@@ -460,21 +682,37 @@ class MemoryService:
             collection_name = self._get_collection_name(character)
             collection = self.client.get_collection(name=collection_name)
 
-            # Get messages (ChromaDB doesn't have native pagination, so we get all and slice)
-            results = collection.get(
-                limit=limit,
-                offset=offset,
-                include=["documents", "metadatas"]
-            )
+            # Recent pages: fetch only the page's rows, in the order the recent-message keys give
+            page_ids = self._recent_page_ids(collection, character, limit, offset)
+            if page_ids is not None:
+                if not page_ids:
+                    return []
+                results = collection.get(ids=page_ids, include=["documents", "metadatas"])
+                rows = {
+                    msg_id: {"id": msg_id, "message": doc, "metadata": meta or {}}
+                    for msg_id, doc, meta in zip(results['ids'], results['documents'], results['metadatas'])
+                }
+                return [rows[msg_id] for msg_id in page_ids if msg_id in rows]
+
+            # Deeper pages: ChromaDB returns rows in storage order, so fetch everything, sort, then slice
+            results = collection.get(include=["documents", "metadatas"])
 
             messages = []
             for i in range(len(results['ids'])):
                 messages.append({
                     "id": results['ids'][i],
                     "message": results['documents'][i],
-                    "metadata": results['metadatas'][i]
+                    "metadata": results['metadatas'][i] or {}
                 })
 
+            # Most recent first - integer compare on ts_ns; legacy rows without it (older than every
+            # ts_ns row) fall back to their ISO timestamp
+            messages.sort(
+                key=lambda m: (m['metadata'].get('ts_ns') or 0, m['metadata'].get('timestamp', '')),
+                reverse=True
+            )
+            messages = messages[offset:offset + limit]
+
             return messages
 
         except Exception as e:
@@ -513,6 +751,13 @@ class MemoryService:
                 except Exception as e:
                     logger.warning(f"Error cleaning up embedding model: {e}")
 
+            # Drop FAISS hot-tier indexes (rebuilt from ChromaDB on demand)
+            if self.hot_store is not None:
+                self.hot_store.clear()
+                self.hot_store = None
+                logger.debug("Cleared FAISS hot tier")
+            self._forget_recent()
+
             # Clean up ChromaDB client
             if self.client is not None:
                 try:
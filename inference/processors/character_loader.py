@@ -2,14 +2,29 @@
 from pathlib import Path
 import logging
 import json
+from dataclasses import dataclass
 from typing import Tuple, List, Dict, Any, Optional
-from .lorebook_generator import LorebookGenerator
 from .age_detector import AgeDetector
 
 logger = logging.getLogger(__name__)
-lorebook_gen = LorebookGenerator()
 age_detector = AgeDetector()
 
+
+@dataclass(slots=True, frozen=True)
+class CharacterData:
+    """Everything loaded for one character from its profile file"""
+    profile: str  # Formatted character profile string
+    name: str
+    avoid_words: Tuple[str, ...]
+    user_name: str
+    companion_type: str
+    gender: str
+    role: str
+    backstory: str
+    lorebook: Optional[Dict]  # Stored lorebook only - none is generated from tags at load time
+    personality_tags: Optional[Dict]
+
+
 def load_user_settings() -> Dict[str, Any]:
     """
     Load user settings from data/profiles/user-profile.json or user-settings.txt (legacy)
@@ -86,13 +101,73 @@ def load_user_settings() -> Dict[str, Any]:
         return defaults
 
 
-def load_default_character_profile() -> Tuple[str, str, List[str], str, str, str, str, str, Optional[Dict], Optional[Dict]]:
+def _read_default_character_setting(profiles_dir: Path) -> Optional[str]:
+    """Read settings.defaultActiveCharacter from user-profile.json (None if missing or encrypted)"""
+    user_profile_json = profiles_dir / "user-profile.json"
+    if not user_profile_json.exists():
+        return None
+
+    try:
+        data = json.loads(user_profile_json.read_text(encoding='utf-8'))
+        if data.get('version') == '2.0' and data.get('settings', {}).get('defaultActiveCharacter'):
+            logger.info(f"Default character loaded from JSON")
+            return data['settings']['defaultActiveCharacter']
+    except (json.JSONDecodeError, KeyError) as e:
+        # Expected: User settings are encrypted
+        logger.debug(f"Could not read default character from JSON (likely encrypted): {e}")
+    return None
+
+
+def load_default_character_names() -> Tuple[str, str]:
+    """
+    Load only the default character's name and the user's name.
+
+    Skips everything load_default_character_profile does beyond that (age validation,
+    lorebook generation, profile formatting) - the full profile is loaded lazily and
+    cached the first time the character is actually used.
+
+    Returns:
+        Tuple of (character_name, user_name)
+    """
+    try:
+        project_root = Path(__file__).resolve().parent.parent.parent
+        profiles_dir = project_root / "data" / "profiles"
+
+        user_name = load_user_settings().get("userName", "User")
+        character_name = _read_default_character_setting(profiles_dir)
+        if not character_name:
+            return "Default Character", user_name
+
+        # Profile's display name wins over the file name (same as the full loader)
+        json_path = profiles_dir / f"{character_name}.json"
+        txt_path = profiles_dir / f"{character_name}.txt"
+        if json_path.exists():
+            try:
+                data = json.loads(json_path.read_text(encoding='utf-8'))
+                if data.get('version') == '2.0' and data.get('type') == 'character':
+                    return data['character'].get('name', character_name), user_name
+            except (json.JSONDecodeError, KeyError) as e:
+                logger.debug(f"Could not parse character profile JSON (likely encrypted): {e}")
+        if txt_path.exists():
+            profile = parse_profile(txt_path.read_text(encoding='utf-8'))
+            if profile:
+                return profile.get('name', character_name), user_name
+
+        # Profile files are encrypted - Node.js will pass character data via API
+        return "Default Character", user_name
+
+    except Exception as e:
+        logger.error(f"Error loading default character names: {e}", exc_info=True)
+        return "Default Character", "User"
+
+
+def load_default_character_profile() -> CharacterData:
     """
     Load the default character profile (used when no specific character is requested).
     Supports both JSON (v2.0) and TXT (legacy) formats.
 
     Returns:
-        Tuple of (character_profile_string, character_name, avoid_words_list, user_name, companion_type, character_gender, character_role, character_backstory, lorebook, personality_tags)
+        CharacterData (profile string, name, avoid words, user name, companion type, gender, role, backstory, lorebook, personality tags)
     """
     try:
         project_root = Path(__file__).resolve().parent.parent.parent
@@ -102,22 +177,8 @@ def load_default_character_profile() -> Tuple[str, str, List[str], str, str, str
         user_settings = load_user_settings()
         user_name = user_settings.get("userName", "User")
 
-        # Load default character name - try JSON first
-        character_name = None
-        user_profile_json = profiles_dir / "user-profile.json"
-
-        # Try JSON format first
-        if user_profile_json.exists():
-            try:
-                content = user_profile_json.read_text(encoding='utf-8')
-                data = json.loads(content)
-
-                if data.get('version') == '2.0' and data.get('settings', {}).get('defaultActiveCharacter'):
-                    character_name = data['settings']['defaultActiveCharacter']
-                    logger.info(f"Default character loaded from JSON")
-            except (json.JSONDecodeError, KeyError) as e:
-                # Expected: User settings are encrypted
-                logger.debug(f"Could not read default character from JSON (likely encrypted): {e}")
+        # Load default character name
+        character_name = _read_default_character_setting(profiles_dir)
 
         if not character_name:
             # Expected: User settings are encrypted - Node.js will pass character data via API
@@ -183,7 +244,7 @@ def load_default_character_profile() -> Tuple[str, str, List[str], str, str, str
             logger.warning(f"   Setting default age: 25")
             profile['age'] = 25
 
-        # Extract or generate lorebook (only in JSON format)
+        # Extract stored lorebook (only in JSON format); lorebooks are not generated at load time
         lorebook = None
         personality_tags = None
         if is_json:
@@ -191,15 +252,6 @@ def load_default_character_profile() -> Tuple[str, str, List[str], str, str, str
             if 'lorebook' in data:
                 lorebook = data['lorebook']
                 logger.info(f"   Found existing lorebook with {len(lorebook.get('chunks', []))} chunks")
-            # Generate from tagSelections if available
-            elif 'tagSelections' in profile and profile['tagSelections']:
-                logger.info(f"   Generating lorebook from tagSelections...")
-                lorebook = lorebook_gen.generate_lorebook_from_tags(
-                    character_name=char_name,
-                    companion_type=companion_type,
-                    selected_tags=profile['tagSelections']
-                )
-                logger.info(f"   ✅ Generated lorebook: {lorebook['total_chunks']} chunks, ~{lorebook['total_tokens']} tokens")
 
             # Extract personality tags for character-emotion interactions
             if 'tagSelections' in profile:
@@ -212,7 +264,18 @@ def load_default_character_profile() -> Tuple[str, str, List[str], str, str, str
         format_type = "JSON" if is_json else "TXT"
         logger.info(f"✅ Loaded character (avoid words: {len(avoid_words)}, format: {format_type})")
 
-        return (character_string, char_name, avoid_words, user_name, companion_type, char_gender, char_role, char_backstory, lorebook, personality_tags)
+        return CharacterData(
+            profile=character_string,
+            name=char_name,
+            avoid_words=tuple(avoid_words),
+            user_name=user_name,
+            companion_type=companion_type,
+            gender=char_gender,
+            role=char_role,
+            backstory=char_backstory,
+            lorebook=lorebook,
+            personality_tags=personality_tags
+        )
 
     except Exception as e:
         logger.error(f"Error loading character profile: {e}", exc_info=True)
@@ -284,14 +347,25 @@ Words/Phrases to Avoid:
     return profile_str
 
 
-def load_default_character(user_name: str = "User") -> Tuple[str, str, List[str], str, str, str, str, str, Optional[Dict], Optional[Dict]]:
+def load_default_character(user_name: str = "User") -> CharacterData:
     """Load default character profile"""
     default_profile = """Character Profile: Default Character
 
 This is a default character profile. Please select a character in the profile builder.
 """
     logger.info("Loading default character")
-    return (default_profile, "Default Character", [], user_name, 'friend', 'female', '', '', None, None)
+    return CharacterData(
+        profile=default_profile,
+        name="Default Character",
+        avoid_words=(),
+        user_name=user_name,
+        companion_type='friend',
+        gender='female',
+        role='',
+        backstory='',
+        lorebook=None,
+        personality_tags=None
+    )
 
 
 def load_consent() -> Optional[Dict[str, Any]]:
@@ -324,7 +398,7 @@ def load_consent() -> Optional[Dict[str, Any]]:
         return None
 
 
-def load_character_by_name(character_name: str) -> Tuple[str, str, List[str], str, str, str, str, str, Optional[Dict], Optional[Dict]]:
+def load_character_by_name(character_name: str) -> CharacterData:
     """
     Load a specific character profile by name.
 
@@ -332,7 +406,7 @@ def load_character_by_name(character_name: str) -> Tuple[str, str, List[str], st
         character_name: Name of the character to load
 
     Returns:
-        Tuple of (character_profile_string, character_name, avoid_words_list, user_name, companion_type, character_gender, character_role, character_backstory, lorebook, personality_tags)
+        CharacterData (profile string, name, avoid words, user name, companion type, gender, role, backstory, lorebook, personality tags)
     """
     try:
         project_root = Path(__file__).resolve().parent.parent.parent
@@ -406,7 +480,7 @@ def load_character_by_name(character_name: str) -> Tuple[str, str, List[str], st
             logger.warning(f"   Setting default age: 25")
             profile['age'] = 25
 
-        # Extract or generate lorebook (only in JSON format)
+        # Extract stored lorebook (only in JSON format); lorebooks are not generated at load time
         lorebook = None
         personality_tags = None
         if is_json:
@@ -414,15 +488,6 @@ def load_character_by_name(character_name: str) -> Tuple[str, str, List[str], st
             if 'lorebook' in data:
                 lorebook = data['lorebook']
                 logger.debug(f"   Found existing lorebook with {len(lorebook.get('chunks', []))} chunks")
-            # Generate from tagSelections if available
-            elif 'tagSelections' in profile and profile['tagSelections']:
-                logger.debug(f"   Generating lorebook from tagSelections...")
-                lorebook = lorebook_gen.generate_lorebook_from_tags(
-                    character_name=char_name,
-                    companion_type=companion_type,
-                    selected_tags=profile['tagSelections']
-                )
-                logger.debug(f"   ✅ Generated lorebook: {lorebook['total_chunks']} chunks, ~{lorebook['total_tokens']} tokens")
 
             # Extract personality tags for character-emotion interactions
             if 'tagSelections' in profile:
@@ -434,7 +499,18 @@ def load_character_by_name(character_name: str) -> Tuple[str, str, List[str], st
 
         logger.debug(f"✅ Loaded character")
 
-        return (character_string, char_name, avoid_words, user_name, companion_type, char_gender, char_role, char_backstory, lorebook, personality_tags)
+        return CharacterData(
+            profile=character_string,
+            name=char_name,
+            avoid_words=tuple(avoid_words),
+            user_name=user_name,
+            companion_type=companion_type,
+            gender=char_gender,
+            role=char_role,
+            backstory=char_backstory,
+            lorebook=lorebook,
+            personality_tags=personality_tags
+        )
 
     except Exception as e:
         logger.error(f"Error loading character {character_name}: {e}", exc_info=True)
@@ -2,6 +2,7 @@
 Context Manager
 Handles memory retrieval and web search context fetching
 """
+import asyncio
 import logging
 from typing import Optional
 
@@ -47,7 +48,9 @@ class ContextManager:
             return ""
 
         try:
-            relevant_memories = self.memory_service.semantic_search(
+            # ChromaDB/FAISS search is blocking - keep it off the event loop so it overlaps other work
+            relevant_memories = await asyncio.to_thread(
+                self.memory_service.semantic_search,
                 query=query,
                 character=character,
                 n_results=5
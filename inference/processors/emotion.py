@@ -104,34 +104,60 @@ class EmotionDetector:
             if not emotion_result or not isinstance(emotion_result[0], list):
                 raise ValueError("Classifier returned an unexpected format.")
 
-            # Sort by score descending
-            sorted_emotions = sorted(emotion_result[0], key=lambda x: x['score'], reverse=True)
+            return self._format_result(emotion_result[0])
 
-            # Get top emotion
-            top_emotion = sorted_emotions[0]
+        except Exception as e:
+            logger.error(f"Emotion detection failed: {e}")
+            # Reraise the exception for the FastAPI wrapper to handle and return 500
+            raise e
+
+    def detect_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Detect emotion for several texts with a single batched classifier call.
+
+        Args:
+            texts: Input texts to analyze
+
+        Returns:
+            List of emotion dictionaries (same shape as detect()), in input order
+        """
+        try:
+            if not self.initialized:
+                raise RuntimeError("Emotion detector is not ready. Initialization failed.")
 
-            # Get top 3 emotions (for context)
-            top_3_emotions = sorted_emotions[:3]
+            if not texts:
+                return []
 
-            # Calculate intensity based on top score
-            intensity = self._calculate_intensity(top_emotion['score'])
+            texts = [text[:self.MAX_EMOTION_TEXT_LENGTH] for text in texts]
 
-            # Categorize emotion
-            category = self._categorize_emotion(top_emotion['label'])
+            # One padded forward pass over the whole batch
+            emotion_results = self.classifier(texts, batch_size=len(texts))
 
-            return {
-                'label': top_emotion['label'],
-                'score': top_emotion['score'],
-                'top_emotions': top_3_emotions,
-                'intensity': intensity,
-                'category': category
-            }
+            if not emotion_results or len(emotion_results) != len(texts) or not isinstance(emotion_results[0], list):
+                raise ValueError("Classifier returned an unexpected format.")
+
+            return [self._format_result(scores) for scores in emotion_results]
 
         except Exception as e:
-            logger.error(f"Emotion detection failed: {e}")
-            # Reraise the exception for the FastAPI wrapper to handle and return 500
+            logger.error(f"Batch emotion detection failed: {e}")
             raise e
 
+    def _format_result(self, scores: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Turn raw classifier scores for one text into the detect() result dict."""
+        # Sort by score descending
+        sorted_emotions = sorted(scores, key=lambda x: x['score'], reverse=True)
+
+        # Get top emotion
+        top_emotion = sorted_emotions[0]
+
+        return {
+            'label': top_emotion['label'],
+            'score': top_emotion['score'],
+            'top_emotions': sorted_emotions[:3],  # Top 3 emotions (for context)
+            'intensity': self._calculate_intensity(top_emotion['score']),
+            'category': self._categorize_emotion(top_emotion['label'])
+        }
+
     def _calculate_intensity(self, score: float) -> str:
         """Calculate emotional intensity from confidence score."""
         if score >= 0.8:
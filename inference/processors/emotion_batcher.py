@@ -0,0 +1,109 @@
+"""
+Emotion Micro-Batcher
+Coalesces concurrent single-text emotion requests into one batched classifier call
+"""
+import asyncio
+import logging
+from concurrent.futures import Executor
+from typing import Dict, Any, List, Optional, Tuple
+
+from .emotion import EmotionDetector
+
+logger = logging.getLogger(__name__)
+
+
+class EmotionMicroBatcher:
+    """Collects requests for a short window and runs them through detect_batch together"""
+
+    def __init__(self, detector: EmotionDetector, executor: Optional[Executor] = None,
+                 max_batch_size: int = 16, window_seconds: float = 0.005):
+        """
+        Initialize micro-batcher
+
+        Args:
+            detector: Initialized EmotionDetector
+            executor: Executor for the blocking classifier call (None = default threadpool)
+            max_batch_size: Maximum texts per classifier call
+            window_seconds: How long to wait for more requests after the first arrives
+        """
+        self.detector = detector
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.window_seconds = window_seconds
+        self._queue: "asyncio.Queue[Tuple[str, asyncio.Future]]" = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the background flush loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush loop and fail any requests still waiting"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Emotion batcher stopped"))
+
+    async def detect(self, text: str) -> Dict[str, Any]:
+        """
+        Queue one text and wait for its result
+
+        Args:
+            text: Input text to analyze
+
+        Returns:
+            Emotion dictionary (same shape as EmotionDetector.detect)
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def _collect_batch(self) -> List[Tuple[str, asyncio.Future]]:
+        """Wait for one request, then gather more until the window closes or the batch is full"""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.window_seconds
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self):
+        """Flush loop - one classifier call per collected batch"""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = await self._collect_batch()
+            texts = [text for text, _ in batch]
+
+            try:
+                results = await loop.run_in_executor(self.executor, self.detector.detect_batch, texts)
+            except Exception as e:
+                logger.error(f"❌ Emotion micro-batch of {len(texts)} failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            if len(texts) > 1:
+                logger.debug(f"Emotion micro-batch flushed {len(texts)} requests")
+
+            for (_, future), result in zip(batch, results):
+                if not future.done():  # Caller may have gone away
+                    future.set_result(result)
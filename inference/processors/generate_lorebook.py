@@ -18,6 +18,7 @@ project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 from inference.processors.lorebook_generator import LorebookGenerator
+from inference.processors.lorebook_templates import json_default
 
 
 def interactive_tag_selection():
@@ -182,11 +183,11 @@ def generate_lorebook_for_character(character_name: str, interactive: bool = Tru
         # Create backup
         backup_path = profile_path.with_suffix('.json.backup')
         with open(backup_path, 'w', encoding='utf-8') as f:
-            json.dump(profile_data, f, indent=2)
+            json.dump(profile_data, f, indent=2, default=json_default)
 
         # Save updated profile
         with open(profile_path, 'w', encoding='utf-8') as f:
-            json.dump(profile_data, f, indent=2)
+            json.dump(profile_data, f, indent=2, default=json_default)
 
         # Get summary
         summary = generator.get_lorebook_summary(lorebook)
@@ -4,11 +4,20 @@ Handles model loading and raw token generation
 """
 from llama_cpp import Llama
 from pathlib import Path
+import asyncio
 import logging
-from typing import Optional, List
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, lru_cache
+from collections import OrderedDict
+from typing import Optional, List, AsyncIterator, Union, Hashable
 
 logger = logging.getLogger(__name__)
 
+# How many times the oldest waiting generation may be passed over in favour of one
+# that shares the prefix already in the KV cache (bounds unfairness / starvation)
+MAX_AFFINITY_SKIPS = 4
+
 
 class LLMInference:
     """Core LLM model operations - loading and generation only"""
@@ -38,6 +47,18 @@ class LLMInference:
         self.use_mlock = use_mlock
         self.llm = None
         self.initialized = False
+        # llama.cpp holds a single model/KV-cache context - serialize all generation
+        # through one dedicated thread instead of the shared default threadpool
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="llm")
+        # Token IDs for static prompt prefixes (one per character profile), most recent last
+        self._prefix_token_cache: "OrderedDict[str, List[int]]" = OrderedDict()
+        self._prefix_token_cache_size = 16
+        # Token counts for strings that repeat across turns (history messages), keyed on the string itself
+        self._count_tokens_cached = lru_cache(maxsize=4096)(self._count_tokens)
+        # Generation slot scheduling (event-loop side): waiters are [affinity_key, future, times_skipped]
+        self._slot_busy = False
+        self._slot_waiters: List[list] = []
+        self._last_affinity_key: Optional[Hashable] = None
 
     async def initialize(self):
         """Load LLM model into memory"""
@@ -72,18 +93,73 @@ class LLMInference:
             self.initialized = False
             raise
 
-    async def generate(self, prompt: str, max_tokens: int = 200,
+    async def _acquire_slot(self, affinity_key: Optional[Hashable] = None):
+        """
+        Wait for the single llama.cpp generation slot.
+
+        When several generations are queued, the one sharing the prefix that was just
+        decoded goes next (its KV cache is still warm, so prefill is skipped), with the
+        oldest waiter never passed over more than MAX_AFFINITY_SKIPS times.
+
+        Args:
+            affinity_key: Identifies the static prompt prefix (None = no preference)
+        """
+        if not self._slot_busy and not self._slot_waiters:
+            self._slot_busy = True
+            self._last_affinity_key = affinity_key
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        waiter = [affinity_key, future, 0]
+        self._slot_waiters.append(waiter)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release_slot()  # Slot was handed over just as we were cancelled
+            elif waiter in self._slot_waiters:
+                self._slot_waiters.remove(waiter)  # Not yet pruned by _release_slot
+            raise
+
+    def _release_slot(self):
+        """Hand the generation slot to the next waiter (prefix affinity first, then FIFO)"""
+        # Waiters cancelled before being woken still sit in the queue with a done future - skip them
+        self._slot_waiters[:] = [waiter for waiter in self._slot_waiters if not waiter[1].done()]
+        if not self._slot_waiters:
+            self._slot_busy = False
+            return
+
+        index = 0
+        if self._last_affinity_key is not None and self._slot_waiters[0][2] < MAX_AFFINITY_SKIPS:
+            for i, waiter in enumerate(self._slot_waiters):
+                if waiter[0] == self._last_affinity_key:
+                    index = i
+                    break
+            for waiter in self._slot_waiters[:index]:
+                waiter[2] += 1
+
+        affinity_key, future, _ = self._slot_waiters.pop(index)
+        self._last_affinity_key = affinity_key
+        future.set_result(None)
+
+    async def generate(self, prompt: Union[str, List[int]], max_tokens: int = 200,
                       temperature: float = 1.0, stop: Optional[List[str]] = None,
-                      stream: bool = False):
+                      stream: bool = False, top_p: float = 0.85,
+                      top_k: int = 40, repeat_penalty: float = 1.15,
+                      affinity_key: Optional[Hashable] = None):
         """
         Generate text from prompt (raw output, no cleaning)
 
         Args:
-            prompt: Input prompt
+            prompt: Input prompt (text, or pre-tokenized IDs including BOS)
             max_tokens: Maximum tokens to generate
             temperature: Sampling temperature
             stop: Stop sequences
             stream: Enable streaming
+            top_p: Nucleus sampling threshold
+            top_k: Sampling candidate limit
+            repeat_penalty: Repetition penalty
+            affinity_key: Static prefix identity, used to schedule KV-cache-sharing requests together
 
         Returns:
             Tuple of (generated_text, tokens_generated) or async generator if streaming
@@ -92,13 +168,14 @@ class LLMInference:
             raise RuntimeError("LLM not initialized")
 
         try:
-            result = self.llm(
+            call = partial(
+                self.llm,
                 prompt,
                 max_tokens=max_tokens,
                 temperature=temperature,
-                top_p=0.85,  # Reduced from 0.95 to prevent confabulation/hallucination
-                top_k=40,  # Limit sampling candidates for faster generation
-                repeat_penalty=1.15,  # Increased from 1.1 to reduce repetition
+                top_p=top_p,  # Default 0.85 (reduced from 0.95 to prevent confabulation/hallucination)
+                top_k=top_k,  # Limit sampling candidates for faster generation
+                repeat_penalty=repeat_penalty,  # Default 1.15 (increased from 1.1 to reduce repetition)
                 stop=stop or [],
                 stream=stream,
                 echo=False,
@@ -109,25 +186,186 @@ class LLMInference:
                 # Metal-specific optimizations
             )
 
+            loop = asyncio.get_running_loop()
+
             if stream:
                 async def stream_generator():
-                    for chunk in result:
-                        text = chunk['choices'][0]['text']
-                        yield text
+                    # Hold the slot for the whole stream; each chunk is pulled on the LLM thread
+                    await self._acquire_slot(affinity_key)
+                    chunks = None
+                    try:
+                        chunks = await loop.run_in_executor(self._executor, call)
+                        while True:
+                            chunk = await loop.run_in_executor(self._executor, next, chunks, None)
+                            if chunk is None:
+                                break
+                            yield chunk['choices'][0]['text']
+                    finally:
+                        if chunks is not None:
+                            await loop.run_in_executor(self._executor, chunks.close)
+                        self._release_slot()
                 return stream_generator()
-            else:
-                generated_text = result['choices'][0]['text']
-                # Extract token count from usage stats if available
+
+            # Blocking llama.cpp call runs on the dedicated LLM thread
+            await self._acquire_slot(affinity_key)
+            try:
+                result = await loop.run_in_executor(self._executor, call)
+            finally:
+                self._release_slot()
+
+            generated_text = result['choices'][0]['text']
+            # llama.cpp reports the exact completion token count in usage stats
+            usage = result.get('usage') or {}
+            tokens_generated = usage.get('completion_tokens')
+            if tokens_generated is None:
                 tokens_generated = len(generated_text.split())  # Approximate word count fallback
-                if 'usage' in result and 'completion_tokens' in result['usage']:
-                    tokens_generated = result['usage']['completion_tokens']
 
-                return generated_text, tokens_generated
+            return generated_text, tokens_generated
 
         except Exception as e:
             logger.error(f"Generation failed: {e}", exc_info=True)
             raise
 
+    async def tokenize_prefix(self, prefix: str) -> List[int]:
+        """
+        Tokenize a static prompt prefix (with BOS), cached by prefix text.
+        Cache misses are tokenized on the dedicated LLM thread.
+
+        Args:
+            prefix: Static prompt prefix
+
+        Returns:
+            Token IDs for the prefix
+        """
+        if not self.initialized:
+            raise RuntimeError("LLM not initialized")
+
+        tokens = self._prefix_token_cache.get(prefix)
+        if tokens is not None:
+            self._prefix_token_cache.move_to_end(prefix)
+            return tokens
+
+        tokens = await asyncio.get_running_loop().run_in_executor(
+            self._executor, partial(self.llm.tokenize, prefix.encode("utf-8"), add_bos=True, special=True)
+        )
+        self._prefix_token_cache[prefix] = tokens
+        while len(self._prefix_token_cache) > self._prefix_token_cache_size:
+            self._prefix_token_cache.popitem(last=False)
+        return tokens
+
+    def _count_tokens(self, text: str) -> int:
+        """Tokenize text (no BOS) and return its token count"""
+        return len(self.llm.tokenize(text.encode("utf-8"), add_bos=False, special=True))
+
+    async def count_tokens(self, text: str) -> int:
+        """
+        Exact token count for text using the loaded model's tokenizer (memoized, runs on the LLM thread).
+
+        Args:
+            text: Text to measure
+
+        Returns:
+            Number of tokens (without BOS)
+        """
+        if not self.initialized:
+            raise RuntimeError("LLM not initialized")
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._count_tokens_cached, text)
+
+    async def join_prefix_tokens(self, prefix_ids: List[int], suffix: str) -> List[int]:
+        """
+        Append a freshly tokenized per-turn suffix (tokenized on the LLM thread) to cached prefix tokens.
+
+        Args:
+            prefix_ids: Token IDs from tokenize_prefix()
+            suffix: Per-turn prompt text
+
+        Returns:
+            Full prompt token IDs (prefix tokens are reused, so llama.cpp's KV prefix match still hits)
+        """
+        if not self.initialized:
+            raise RuntimeError("LLM not initialized")
+
+        suffix_ids = await asyncio.get_running_loop().run_in_executor(
+            self._executor, partial(self.llm.tokenize, suffix.encode("utf-8"), add_bos=False, special=True)
+        )
+        return prefix_ids + suffix_ids
+
+    async def generate_stream(self, prompt: Union[str, List[int]], max_tokens: int = 200,
+                              temperature: float = 1.0, stop: Optional[List[str]] = None,
+                              top_p: float = 0.85, top_k: int = 40,
+                              repeat_penalty: float = 1.15,
+                              affinity_key: Optional[Hashable] = None) -> AsyncIterator[str]:
+        """
+        Stream generated text chunks without blocking the event loop.
+
+        llama.cpp iterates in a worker thread and hands chunks back through an
+        asyncio.Queue. Closing the generator early (client disconnect, cancellation)
+        signals the worker to stop at the next token.
+
+        Args:
+            prompt: Input prompt (text, or pre-tokenized IDs including BOS)
+            max_tokens: Maximum tokens to generate
+            temperature: Sampling temperature
+            stop: Stop sequences
+            top_p: Nucleus sampling threshold
+            top_k: Sampling candidate limit
+            repeat_penalty: Repetition penalty
+            affinity_key: Static prefix identity, used to schedule KV-cache-sharing requests together
+
+        Yields:
+            Text chunks as they are produced
+        """
+        if not self.initialized:
+            raise RuntimeError("LLM not initialized")
+
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stop_event = threading.Event()
+        done = object()
+
+        def worker():
+            try:
+                for chunk in self.llm(
+                    prompt,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    top_p=top_p,
+                    top_k=top_k,
+                    repeat_penalty=repeat_penalty,
+                    stop=stop or [],
+                    stream=True,
+                    echo=False,
+                    min_p=0.05,
+                    tfs_z=1.0,
+                    mirostat_mode=0,
+                ):
+                    if stop_event.is_set():
+                        break
+                    loop.call_soon_threadsafe(queue.put_nowait, chunk['choices'][0]['text'])
+            except Exception as e:
+                logger.error(f"Streaming generation failed: {e}", exc_info=True)
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, done)
+
+        await self._acquire_slot(affinity_key)
+        try:
+            worker_future = loop.run_in_executor(self._executor, worker)
+
+            try:
+                while True:
+                    item = await queue.get()
+                    if item is done:
+                        break
+                    if isinstance(item, Exception):
+                        raise item
+                    yield item
+            finally:
+                stop_event.set()
+                await worker_future
+        finally:
+            self._release_slot()
+
     def cleanup(self):
         """Unload LLM model from memory"""
         try:
@@ -137,6 +375,10 @@ class LLMInference:
                 del self.llm
                 self.llm = None
                 self.initialized = False
+                # Counts (and prefix tokens) belong to this model's tokenizer
+                self._count_tokens_cached.cache_clear()
+                self._prefix_token_cache.clear()
                 logger.info("✅ LLM model unloaded successfully")
+            self._executor.shutdown(wait=False)
         except Exception as e:
             logger.error(f"Error unloading LLM model: {e}", exc_info=True)
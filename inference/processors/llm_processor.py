@@ -2,19 +2,25 @@
 LLM Processor - Main orchestrator
 Coordinates all LLM-related processing using modular components
 """
+import asyncio
+import json
 import logging
-from typing import Optional, List, Dict, Any
+import re
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, List, Dict, Any, AsyncIterator, Awaitable
 from pathlib import Path
 
 from .llm_inference import LLMInference
-from .prompt_builder import PromptBuilder
-from .response_cleaner import ResponseCleaner
+from .prompt_builder import PromptBuilder, STARTER_PREFIX, MAX_HISTORY_TURNS
+from .response_cleaner import ResponseCleaner, AvoidPattern, AhoCorasickAvoidMatcher, AHOCORASICK_AVAILABLE
 from .context_manager import ContextManager
 from .crisis_detector import CrisisDetector
 from .age_detector import AgeDetector
-from .lorebook_generator import LorebookGenerator
 from .character_loader import (
-    load_default_character_profile,
+    CharacterData,
+    load_default_character_names,
     load_character_by_name,
     load_user_settings,
     format_character_profile
@@ -23,6 +29,224 @@ from .character_loader import (
 logger = logging.getLogger(__name__)
 
 
+def _avoid_key(avoid_words) -> frozenset:
+    """Normalize an avoid-word list to its set of stripped, non-empty phrases"""
+    return frozenset(p.strip() for p in avoid_words or () if p and p.strip())
+
+
+# Below this many phrases the regex alternation is already as fast as the automaton
+AHO_CORASICK_MIN_PHRASES = 20
+
+
+@lru_cache(maxsize=64)
+def _compile_avoid_pattern(avoid_words: frozenset) -> Optional[AvoidPattern]:
+    """
+    Compile all avoid words/phrases into one case-insensitive alternation.
+
+    One pattern means a single scan of the response instead of one pass per phrase.
+    Longer phrases come first so they win over any shorter phrase they contain.
+    Keyed on the phrase set, so characters with the same list (in any order, with
+    duplicates or stray whitespace) share one compiled pattern object.
+    Large lists use an Aho-Corasick automaton (pyahocorasick, when installed) with the same matching rules.
+
+    Args:
+        avoid_words: Set of stripped words/phrases to remove (see _avoid_key)
+
+    Returns:
+        Compiled pattern (or equivalent matcher), or None if there is nothing to avoid
+    """
+    alternatives = []
+    for phrase in sorted(avoid_words, key=lambda p: (-len(p), p)):
+        escaped = re.escape(phrase)
+        if phrase[0].isalnum():
+            escaped = r'\b' + escaped
+        if phrase[-1].isalnum():
+            escaped = escaped + r'\b'
+        alternatives.append(escaped)
+
+    if not alternatives:
+        return None
+
+    pattern = re.compile('|'.join(alternatives), re.IGNORECASE)
+    if AHOCORASICK_AVAILABLE and len(avoid_words) >= AHO_CORASICK_MIN_PHRASES:
+        return AhoCorasickAvoidMatcher(avoid_words, fallback=pattern)
+    return pattern
+
+
+@lru_cache(maxsize=64)
+def _load_character_data(character_name: str) -> CharacterData:
+    """
+    Load character data from disk (cached per character name).
+
+    Always uses load_character_by_name to ensure we get the correct character
+    (load_default_character_profile ignores the character_name parameter).
+    """
+    return load_character_by_name(character_name)
+
+
+@lru_cache(maxsize=64)
+def _build_prompt_builder(character_name: str) -> PromptBuilder:
+    """Create a PromptBuilder for a disk-loaded character (cached per character name)"""
+    character = _load_character_data(character_name)
+
+    # Load user settings
+    user_settings = load_user_settings()
+
+    prompt_builder = PromptBuilder(
+        character_profile=character.profile,
+        character_name=character.name,
+        character_gender=character.gender,
+        character_role=character.role,
+        character_backstory=character.backstory,
+        avoid_words=character.avoid_words,
+        user_name=character.user_name,
+        companion_type=character.companion_type,
+        user_gender=user_settings.get('userGender', 'non-binary'),
+        user_species=user_settings.get('userSpecies', 'human'),
+        user_timezone=user_settings.get('timezone', 'UTC'),
+        user_backstory=user_settings.get('userBackstory', ''),
+        user_preferences=user_settings.get('userPreferences', {}),
+        major_life_events=user_settings.get('majorLifeEvents', []),
+        shared_roleplay_events=user_settings.get('sharedRoleplayEvents', []),
+        user_communication_boundaries=user_settings.get('communicationBoundaries', ''),
+        lorebook=character.lorebook,
+        personality_tags=character.personality_tags
+    )
+
+    logger.debug(f"Created PromptBuilder for character")
+    return prompt_builder
+
+
+def _make_response_cleaner(char_name: str, user_name: str, avoid_words) -> ResponseCleaner:
+    """Create a ResponseCleaner with the shared compiled avoid pattern for this word list"""
+    key = _avoid_key(avoid_words)
+    return ResponseCleaner(
+        character_name=char_name,
+        user_name=user_name,
+        avoid_pattern=_compile_avoid_pattern(key),
+        avoid_max_len=max(map(len, key), default=0)
+    )
+
+
+@lru_cache(maxsize=64)
+def _build_response_cleaner(character_name: str) -> ResponseCleaner:
+    """Create a ResponseCleaner for a disk-loaded character (cached with its character data)"""
+    character = _load_character_data(character_name)
+    return _make_response_cleaner(character.name, character.user_name, character.avoid_words)
+
+
+@lru_cache(maxsize=64)
+def _build_profile_prompt_builder(profile_key: str, char_name: str) -> PromptBuilder:
+    """
+    Create a PromptBuilder from a character_profile dict sent by Node.js.
+
+    Cached on the profile's canonical JSON, so the boundaries parse, profile formatting
+    and PromptBuilder setup run once per distinct profile instead of on every turn.
+
+    Args:
+        profile_key: character_profile serialized with sort_keys=True
+        char_name: Resolved character name
+
+    Returns:
+        PromptBuilder for this profile
+    """
+    character_profile = json.loads(profile_key)
+
+    # Get or format character string. Formatting happens once per distinct profile (this
+    # function is cached on the contents), and the string lives exactly as long as the builder
+    if character_profile.get('characterString'):
+        character_string = character_profile.get('characterString')
+    else:
+        character_string = format_character_profile(character_profile)
+
+    avoid_words = character_profile.get('avoidWords', [])
+    companion_type = character_profile.get('companionType', 'friend')
+
+    # Extract character metadata
+    character_gender = character_profile.get('gender', 'unknown')
+    character_role = character_profile.get('role', '')
+    character_backstory = character_profile.get('backstory', '')
+    tag_selections = character_profile.get('tagSelections', {})
+
+    # Extract character boundaries (string with newlines → list)
+    character_boundaries_str = character_profile.get('boundaries', '')
+    character_boundaries = []
+    for line in character_boundaries_str.splitlines():
+        boundary = line.strip()
+        if boundary and boundary != '-':
+            character_boundaries.append(boundary)
+
+    # Extract additional character fields for identity chunks
+    character_species = character_profile.get('species', 'Human')
+    character_age = character_profile.get('age', 25)
+    character_interests = character_profile.get('interests', '')
+
+    # Extract user settings from character_profile (Node.js merged them in)
+    user_name = character_profile.get('user_name', character_profile.get('userName', 'User'))
+    user_gender = character_profile.get('user_gender', 'non-binary')
+    user_species = character_profile.get('user_species', 'human')
+    user_timezone = character_profile.get('user_timezone', 'UTC')
+    user_backstory = character_profile.get('user_backstory', '')
+    user_preferences = character_profile.get('user_preferences', {})
+    major_life_events = character_profile.get('user_major_life_events', [])
+    shared_roleplay_events = character_profile.get('shared_roleplay_events', [])
+    user_communication_boundaries = character_profile.get('user_communication_boundaries', '')
+
+    # Stored lorebook only - PromptBuilder doesn't read it, so none is generated from tagSelections here
+    lorebook = character_profile.get('lorebook', {})
+
+    # Create PromptBuilder directly from provided data
+    return PromptBuilder(
+        character_profile=character_string,
+        character_name=char_name,
+        character_gender=character_gender,
+        character_role=character_role,
+        character_backstory=character_backstory,
+        avoid_words=avoid_words,
+        user_name=user_name,
+        companion_type=companion_type,
+        user_gender=user_gender,
+        user_species=user_species,
+        user_timezone=user_timezone,
+        user_backstory=user_backstory,
+        user_preferences=user_preferences,
+        major_life_events=major_life_events,
+        shared_roleplay_events=shared_roleplay_events,
+        user_communication_boundaries=user_communication_boundaries,
+        lorebook=lorebook,
+        personality_tags=tag_selections,  # Pass the dict, not a list
+        # V3 additions for identity chunks
+        character_species=character_species,
+        character_age=character_age,
+        character_interests=character_interests,
+        character_boundaries=character_boundaries
+    )
+
+
+def _clear_character_caches():
+    """Drop every cached loader result (profile updates, character reloads)"""
+    _load_character_data.cache_clear()
+    _build_prompt_builder.cache_clear()
+    _build_response_cleaner.cache_clear()
+    _build_profile_prompt_builder.cache_clear()
+
+
+@dataclass(slots=True)
+class GenerationPlan:
+    """Everything _run_plan needs for one generation (built by generate_response / generate_with_context)"""
+    prompt_builder: PromptBuilder
+    response_cleaner: ResponseCleaner
+    text: str
+    conversation_history: List[Dict]
+    emotion: str
+    emotion_data: Optional[Dict]
+    context: Awaitable  # Resolves to (memory_context, search_context) - see _fetch_context
+    age_violation: bool = False
+    max_tokens_override: Optional[int] = None
+    temperature_override: Optional[float] = None
+    cancel_event: Optional[threading.Event] = None
+
+
 class LLMProcessor:
     """
     Main LLM processor that orchestrates:
@@ -80,11 +304,6 @@ class LLMProcessor:
         self.default_character_name = None
         self.user_name = "User"
 
-        # Cache for character-specific prompt builders (avoid words are NOT cached)
-        self._prompt_builder_cache: Dict[str, PromptBuilder] = {}
-        self._character_data_cache: Dict[str, tuple] = {}
-        self._formatted_profile_cache: Dict[str, str] = {}  # Cache for formatted character strings
-
     async def initialize(self):
         """Initialize the LLM model and load character profile"""
         try:
@@ -106,27 +325,10 @@ class LLMProcessor:
         """Reload default character profile"""
         try:
             # Clear all caches to force reload with updated data
-            self._prompt_builder_cache.clear()
-            self._character_data_cache.clear()
-            self._formatted_profile_cache.clear()
-
-            # Load default character data
-            (
-                character_profile,
-                character_name,
-                avoid_words,
-                user_name,
-                companion_type,
-                character_gender,
-                character_role,
-                character_backstory,
-                lorebook,
-                personality_tags,
-            ) = load_default_character_profile()
-
-            # Store default character info
-            self.default_character_name = character_name
-            self.user_name = user_name
+            _clear_character_caches()
+
+            # Only the two names are needed here; the full profile loads (cached) on first use
+            self.default_character_name, self.user_name = load_default_character_names()
 
             # Create default PromptBuilder and ResponseCleaner
             # These will be used as templates
@@ -144,21 +346,22 @@ class LLMProcessor:
         Args:
             character_name: Name of character to clear from cache
         """
-        if character_name in self._prompt_builder_cache:
-            del self._prompt_builder_cache[character_name]
-            logger.debug(f"Cleared prompt builder cache for {character_name}")
-
-        if character_name in self._character_data_cache:
-            del self._character_data_cache[character_name]
-            logger.debug(f"Cleared character data cache for {character_name}")
-
-        if character_name in self._formatted_profile_cache:
-            del self._formatted_profile_cache[character_name]
-            logger.debug(f"Cleared formatted profile cache for {character_name}")
+        # lru_cache can't evict one key; profile updates are rare, so drop everything
+        _clear_character_caches()
 
         logger.info(f"✅ Cleared all caches for character: {character_name}")
 
-    def _load_character_data(self, character_name: Optional[str] = None) -> tuple:
+    def clear_all_character_caches(self):
+        """
+        Drop every cached character entry (data, PromptBuilders, ResponseCleaners, profile-path builders).
+        All of them are bounded LRUs, so this is for freshness only.
+        """
+        if logger.isEnabledFor(logging.INFO):
+            cached = _load_character_data.cache_info().currsize + _build_profile_prompt_builder.cache_info().currsize
+            logger.info("✅ Cleared all character caches (%d characters/profiles cached)", cached)
+        _clear_character_caches()
+
+    def _load_character_data(self, character_name: Optional[str] = None) -> CharacterData:
         """
         Load character data with caching.
 
@@ -166,25 +369,9 @@ class LLMProcessor:
             character_name: Name of character, or None for default
 
         Returns:
-            Tuple of character data
+            CharacterData for the character
         """
-        # Use default if no character specified
-        if not character_name:
-            character_name = self.default_character_name
-
-        # Check cache first
-        if character_name in self._character_data_cache:
-            return self._character_data_cache[character_name]
-
-        # Load character data
-        # Always use load_character_by_name to ensure we get the correct character
-        # (load_default_character_profile ignores the character_name parameter)
-        char_data = load_character_by_name(character_name)
-
-        # Cache it
-        self._character_data_cache[character_name] = char_data
-
-        return char_data
+        return _load_character_data(character_name or self.default_character_name)
 
     def _get_prompt_builder_for_character(self, character_name: Optional[str] = None) -> PromptBuilder:
         """
@@ -197,63 +384,13 @@ class LLMProcessor:
         Returns:
             PromptBuilder instance for the character
         """
-        # Use default if no character specified
-        if not character_name:
-            character_name = self.default_character_name
-
-        # Check cache first
-        if character_name in self._prompt_builder_cache:
-            return self._prompt_builder_cache[character_name]
-
-        # Load character data (cached)
-        (
-            character_profile,
-            char_name,
-            avoid_words,
-            user_name,
-            companion_type,
-            character_gender,
-            character_role,
-            character_backstory,
-            lorebook,
-            personality_tags,
-        ) = self._load_character_data(character_name)
-
-        # Load user settings
-        user_settings = load_user_settings()
-
-        # Create PromptBuilder
-        prompt_builder = PromptBuilder(
-            character_profile=character_profile,
-            character_name=char_name,
-            character_gender=character_gender,
-            character_role=character_role,
-            character_backstory=character_backstory,
-            avoid_words=avoid_words,
-            user_name=user_name,
-            companion_type=companion_type,
-            user_gender=user_settings.get('userGender', 'non-binary'),
-            user_species=user_settings.get('userSpecies', 'human'),
-            user_timezone=user_settings.get('timezone', 'UTC'),
-            user_backstory=user_settings.get('userBackstory', ''),
-            user_preferences=user_settings.get('userPreferences', {}),
-            major_life_events=user_settings.get('majorLifeEvents', []),
-            shared_roleplay_events=user_settings.get('sharedRoleplayEvents', []),
-            user_communication_boundaries=user_settings.get('communicationBoundaries', ''),
-            lorebook=lorebook,
-            personality_tags=personality_tags
-        )
-
-        # Cache it
-        self._prompt_builder_cache[character_name] = prompt_builder
-
-        logger.debug(f"Created PromptBuilder for character")
-        return prompt_builder
+        return _build_prompt_builder(character_name or self.default_character_name)
 
     def _create_response_cleaner(self, char_name: str, user_name: str, avoid_words: list) -> ResponseCleaner:
         """
         Create a ResponseCleaner with avoid word patterns.
-        Avoid words are NEVER cached - always compiled fresh from the provided list.
+        Avoid words are NEVER cached by character - the pattern is keyed on the word list itself,
+        so an updated list always compiles a new pattern.
 
         Args:
             char_name: Character name
@@ -263,23 +400,213 @@ class LLMProcessor:
         Returns:
             ResponseCleaner instance
         """
-        import re
-        avoid_patterns = []
-        for phrase in avoid_words:
-            if phrase:
-                escaped = re.escape(phrase.strip())
-                if phrase.strip() and phrase.strip()[0].isalnum():
-                    escaped = r'\b' + escaped
-                if phrase.strip() and phrase.strip()[-1].isalnum():
-                    escaped = escaped + r'\b'
-                avoid_patterns.append(re.compile(escaped, re.IGNORECASE))
-
-        return ResponseCleaner(
-            character_name=char_name,
-            user_name=user_name,
-            avoid_patterns=avoid_patterns
+        return _make_response_cleaner(char_name, user_name, avoid_words)
+
+    async def _build_prompt_ids(
+            self,
+            prompt_builder: PromptBuilder,
+            text: str,
+            conversation_history: List[Dict],
+            max_tokens_override: Optional[int] = None,
+            temperature_override: Optional[float] = None,
+            **build_kwargs
+    ) -> tuple:
+        """
+        Build and tokenize a prompt, dropping the oldest history turns if it would overflow the context
+
+        The prompt is measured in real tokens (cached prefix tokens + tokenized suffix) rather than
+        a chars/4 estimate, and history turns are sized with the cached count_tokens().
+
+        Args:
+            prompt_builder: Character's PromptBuilder
+            text: User's message
+            conversation_history: Previous messages [{role, content}]
+            max_tokens_override: Replaces the builder's max_tokens (optional)
+            temperature_override: Replaces the builder's temperature (optional)
+            **build_kwargs: Passed through to build_prompt_parts
+
+        Returns:
+            Tuple of (prefix, prompt_ids, max_tokens, temperature)
+        """
+        history = conversation_history
+        while True:
+            # Pure-CPU string assembly runs in a worker thread so other requests keep making progress
+            prefix, suffix, max_tokens, temperature = await asyncio.to_thread(
+                prompt_builder.build_prompt_parts,
+                text=text,
+                conversation_history=history,
+                **build_kwargs
+            )
+            if max_tokens_override:
+                max_tokens = max_tokens_override
+            if temperature_override is not None:
+                temperature = temperature_override
+
+            prompt_ids = await self.llm_inference.join_prefix_tokens(
+                await self.llm_inference.tokenize_prefix(prefix), suffix
+            )
+            overflow = len(prompt_ids) + max_tokens - self.llm_inference.n_ctx
+            if overflow <= 0 or not history:
+                break
+
+            # Drop just enough of the oldest turns (the builder only uses the last MAX_HISTORY_TURNS) to cover the overflow
+            history = history[-MAX_HISTORY_TURNS:]
+            dropped_tokens = 0
+            dropped_turns = 0
+            while dropped_turns < len(history) and dropped_tokens < overflow:
+                turn = history[dropped_turns]
+                dropped_tokens += await self.llm_inference.count_tokens(turn.get('content') or turn.get('text', ''))
+                dropped_turns += 1
+            history = history[dropped_turns:]
+            logger.warning("⚠️  Prompt over context by %d tokens - dropped %d oldest history turns", overflow, dropped_turns)
+
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Prompt: %d tokens (context %d)", len(prompt_ids), self.llm_inference.n_ctx)
+            logger.info("Generation params: max_tokens=%s, temp=%s", max_tokens, temperature)
+
+        return prefix, prompt_ids, max_tokens, temperature
+
+    async def _generate_filtered(
+            self,
+            prompt_ids: List[int],
+            response_cleaner: ResponseCleaner,
+            max_tokens: int,
+            temperature: float,
+            cancel_event: Optional[threading.Event] = None,
+            affinity_key: Optional[str] = None
+    ) -> tuple:
+        """
+        Stream a completion and strip avoid words as tokens arrive
+
+        Avoid words are stripped incrementally between tokens; clean() still runs a final
+        avoid pass after its structural passes, so none survive a structural rewrite.
+
+        Args:
+            prompt_ids: Full prompt token IDs
+            response_cleaner: Cleaner whose avoid pattern filters the stream
+            max_tokens: Maximum tokens to generate
+            temperature: Sampling temperature
+            cancel_event: Optional flag; the stream is closed within one token of it being set
+            affinity_key: Static prompt prefix (queued requests sharing it run back to back)
+
+        Returns:
+            Tuple of (filtered_text, tokens_generated)
+        """
+        stream_filter = response_cleaner.stream_filter()
+        pieces = []
+        tokens_generated = 0
+
+        stream = self.llm_inference.generate_stream(
+            prompt_ids,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            affinity_key=affinity_key
+        )
+        try:
+            async for chunk in stream:
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+                tokens_generated += 1  # One streamed chunk per token
+                pieces.append(stream_filter.feed(chunk))
+        finally:
+            await stream.aclose()  # Stops the llama.cpp worker at the next token
+
+        pieces.append(stream_filter.flush())
+        return ''.join(pieces), tokens_generated
+
+    async def _fetch_context(
+            self,
+            text: str,
+            char_name: str,
+            search_context: Optional[str] = None,
+            enable_memory: Optional[bool] = None,
+            enable_web_search: bool = False,
+            web_search_api_key: Optional[str] = None
+    ) -> tuple:
+        """
+        Fetch memory context and (unless already provided) web context concurrently
+
+        Args:
+            text: User's message
+            char_name: Resolved character name
+            search_context: Pre-fetched web search results (skips the web fetch)
+            enable_memory: Memory override (None = user setting)
+            enable_web_search: User preference for web search
+            web_search_api_key: Brave Search API key
+
+        Returns:
+            Tuple of (memory_context, search_context)
+        """
+        memory_coro = self.context_manager.fetch_memory_context(
+            query=text,
+            character=char_name,
+            user_name=self.user_name,
+            enable_memory_override=enable_memory
+        )
+        if search_context:
+            return await memory_coro, search_context
+
+        # Detect if this is a conversation starter (don't search for starters)
+        is_starter = text.startswith(STARTER_PREFIX)
+        memory_context, search_context = await asyncio.gather(
+            memory_coro,
+            self.context_manager.fetch_web_context(
+                text=text,
+                is_starter=is_starter,
+                enable_web_search=enable_web_search,
+                api_key=web_search_api_key
+            )
+        )
+        return memory_context, search_context
+
+    async def _run_plan(self, plan: GenerationPlan) -> tuple:
+        """
+        Shared generation pipeline: context -> prompt -> streamed generation -> cleaning
+
+        Args:
+            plan: GenerationPlan for this request
+
+        Returns:
+            Tuple of (cleaned_response, tokens_generated)
+        """
+        # 1. Collect memory and web context (may already be running)
+        memory_context, search_context = await plan.context
+
+        # 2. Build and tokenize the prompt (static prefix + per-turn suffix) and get generation parameters
+        prefix, prompt_ids, max_tokens, temperature = await self._build_prompt_ids(
+            plan.prompt_builder,
+            text=plan.text,
+            conversation_history=plan.conversation_history,
+            max_tokens_override=plan.max_tokens_override,
+            temperature_override=plan.temperature_override,
+            emotion=plan.emotion,
+            search_context=search_context,
+            emotion_data=plan.emotion_data,
+            memory_context=memory_context,
+            age_violation_detected=plan.age_violation
+        )
+
+        # 3. Generate (static prefix tokens hit llama.cpp's KV prefix reuse; avoid words stripped while streaming)
+        raw_response, tokens_generated = await self._generate_filtered(
+            prompt_ids,
+            plan.response_cleaner,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            cancel_event=plan.cancel_event,  # Stops generation within one token of /cancel
+            affinity_key=prefix
         )
 
+        # Check for cancellation after generation (before cleaning/returning)
+        if plan.cancel_event is not None and plan.cancel_event.is_set():
+            logger.info(f"🚫 Request cancelled during generation (discarding result)")
+            raise RuntimeError("Request cancelled by client")
+
+        logger.debug(f"Raw response: {tokens_generated} tokens")
+
+        # 4. Clean the response
+        cleaned_response = plan.response_cleaner.clean(raw_response, user_message=plan.text)
+        return cleaned_response, tokens_generated
+
     async def generate_response(
             self,
             text: str,
@@ -304,11 +631,25 @@ class LLMProcessor:
         if not self.initialized:
             raise RuntimeError("LLMProcessor not initialized. Call initialize() first.")
 
+        # Get the actual character name (resolved from default if needed)
+        char_name = character_name or self.default_character_name
+
+        # Context fetches (I/O) start now and overlap the safety detectors (CPU, run in threads)
+        context_task = asyncio.create_task(self._fetch_context(text, char_name))
+
+        try:
+            (is_crisis, risk_level, intervention_message), (is_age_violation, _) = await asyncio.gather(
+                asyncio.to_thread(self.crisis_detector.detect, text),
+                asyncio.to_thread(self.age_detector.detect, text)
+            )
+        except Exception:
+            context_task.cancel()
+            raise
+
         # PRIORITY 0: CRISIS DETECTION (IMMEDIATE OVERRIDE)
         # Check for suicidal ideation or self-harm BEFORE any processing
-        is_crisis, risk_level, intervention_message = self.crisis_detector.detect(text)
-
         if is_crisis:
+            context_task.cancel()
             logger.warning(f"🚨 CRISIS DETECTED - Risk level: {risk_level}")
             logger.warning(f"   Returning intervention message immediately")
             return {
@@ -323,59 +664,22 @@ class LLMProcessor:
 
         # PRIORITY 1: AGE RESTRICTION (DETECTION)
         # Check for underage content and flag for graceful redirection
-        is_age_violation, _ = self.age_detector.detect(text)
-
         if is_age_violation:
             logger.warning(f"⚠️  AGE RESTRICTION VIOLATION DETECTED")
             logger.warning(f"   Will gracefully redirect to 25+ ages")
 
         try:
-            # Get character-specific components
-            prompt_builder = self._get_prompt_builder_for_character(character_name)
-            response_cleaner = self._get_response_cleaner_for_character(character_name)
-
-            # Get the actual character name (resolved from default if needed)
-            char_name = character_name or self.default_character_name
-
-            # 1. Fetch context from memory and web if available
-            # Detect if this is a conversation starter (don't search for starters)
-            is_starter = "[System: Generate a brief, natural conversation starter" in text
-
-            memory_context = await self.context_manager.fetch_memory_context(
-                query=text,
-                character=char_name,
-                user_name=self.user_name
-            )
-
-            search_context = await self.context_manager.fetch_web_context(text, is_starter=is_starter)
-
-            # 2. Build the complete prompt and get generation parameters
-            prompt, max_tokens, temperature = prompt_builder.build_prompt(
+            # Character-specific components, then the shared pipeline (context already running)
+            cleaned_response, tokens_generated = await self._run_plan(GenerationPlan(
+                prompt_builder=self._get_prompt_builder_for_character(character_name),
+                response_cleaner=self._get_response_cleaner_for_character(character_name),
                 text=text,
-                emotion=emotion,
                 conversation_history=conversation_history,
-                search_context=search_context,
+                emotion=emotion,
                 emotion_data=emotion_data,
-                memory_context=memory_context,
-                age_violation_detected=is_age_violation
-            )
-
-            logger.info(f"TOTAL PROMPT SIZE: {len(prompt)} chars (~{len(prompt)//4} tokens)")
-
-            logger.debug(f"Prompt length: {len(prompt)} chars")
-            logger.debug(f"Generation params: max_tokens={max_tokens}, temp={temperature}")
-
-            # 4. Generate response from LLM
-            raw_response, tokens_generated = await self.llm_inference.generate(
-                prompt=prompt,
-                max_tokens=max_tokens,
-                temperature=temperature
-            )
-
-            logger.debug(f"Raw response: {tokens_generated} tokens")
-
-            # 5. Clean the response
-            cleaned_response = response_cleaner.clean(raw_response, user_message=text)
+                context=context_task,
+                age_violation=is_age_violation
+            ))
 
             logger.info(f"✅ Generated response: {len(cleaned_response)} chars, {tokens_generated} tokens")
 
@@ -389,6 +693,7 @@ class LLMProcessor:
             }
 
         except Exception as e:
+            context_task.cancel()  # No-op if it already finished
             logger.error(f"❌ Error generating response: {e}", exc_info=True)
             return {
                 'success': False,
@@ -397,6 +702,88 @@ class LLMProcessor:
                 'error': str(e)
             }
 
+    async def generate_from_prompt(
+            self,
+            prompt: str,
+            max_tokens: int = 800,
+            temperature: float = 0.8,
+            top_p: float = 0.95,
+            top_k: int = 40,
+            repeat_penalty: float = 1.1,
+            stop_sequences: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Generate a completion for a fully-built prompt (no prompt building or cleaning)
+
+        Args:
+            prompt: Raw prompt text
+            max_tokens: Maximum tokens to generate
+            temperature: Sampling temperature
+            top_p: Nucleus sampling threshold
+            top_k: Sampling candidate limit
+            repeat_penalty: Repetition penalty
+            stop_sequences: Stop sequences
+
+        Returns:
+            Dict with 'text' and 'tokens_generated' (llama.cpp completion token count)
+        """
+        if not self.initialized:
+            raise RuntimeError("LLMProcessor not initialized. Call initialize() first.")
+
+        text, tokens_generated = await self.llm_inference.generate(
+            prompt=prompt,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stop=stop_sequences,
+            top_p=top_p,
+            top_k=top_k,
+            repeat_penalty=repeat_penalty
+        )
+
+        return {
+            'text': text,
+            'tokens_generated': tokens_generated
+        }
+
+    async def generate_stream(
+            self,
+            prompt: str,
+            max_tokens: int = 800,
+            temperature: float = 0.8,
+            top_p: float = 0.95,
+            top_k: int = 40,
+            repeat_penalty: float = 1.1,
+            stop_sequences: Optional[List[str]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream a completion for a fully-built prompt, chunk by chunk
+
+        Args:
+            prompt: Raw prompt text
+            max_tokens: Maximum tokens to generate
+            temperature: Sampling temperature
+            top_p: Nucleus sampling threshold
+            top_k: Sampling candidate limit
+            repeat_penalty: Repetition penalty
+            stop_sequences: Stop sequences
+
+        Yields:
+            Text chunks as llama.cpp produces them
+        """
+        if not self.initialized:
+            raise RuntimeError("LLMProcessor not initialized. Call initialize() first.")
+
+        async for chunk in self.llm_inference.generate_stream(
+            prompt=prompt,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stop=stop_sequences,
+            top_p=top_p,
+            top_k=top_k,
+            repeat_penalty=repeat_penalty
+        ):
+            yield chunk
+
     async def generate_with_context(
             self,
             text: str,
@@ -410,7 +797,8 @@ class LLMProcessor:
             request_id: Optional[str] = None,
             enable_memory: Optional[bool] = False,
             enable_web_search: Optional[bool] = False,
-            web_search_api_key: Optional[str] = None
+            web_search_api_key: Optional[str] = None,
+            cancel_event: Optional[threading.Event] = None
     ) -> Dict[str, Any]:
         """
         Generate a response with explicit context (for advanced API usage)
@@ -425,6 +813,7 @@ class LLMProcessor:
             temperature_override: Override generation temperature
             character_name: Name of character to use (None = default)
             request_id: Request ID for cancellation tracking (optional)
+            cancel_event: Set by /cancel; checked between generated tokens (optional)
 
         Returns:
             Dict with 'text' and 'tokens_generated'
@@ -433,12 +822,9 @@ class LLMProcessor:
             raise RuntimeError("LLMProcessor not initialized. Call initialize() first.")
 
         # Check for cancellation at start
-        if request_id:
-            from main import cancelled_requests
-            if request_id in cancelled_requests:
-                logger.info(f"🚫 Request cancelled before generation")
-                cancelled_requests.discard(request_id)
-                raise RuntimeError("Request cancelled by client")
+        if cancel_event is not None and cancel_event.is_set():
+            logger.info(f"🚫 Request cancelled before generation")
+            raise RuntimeError("Request cancelled by client")
 
         try:
             conversation_history = conversation_history or []
@@ -460,87 +846,13 @@ class LLMProcessor:
                 # Extract data from the provided character_profile dict
                 char_name = character_profile.get('characterName', character_name or self.default_character_name)
 
-                # Get or format character string (with caching to avoid redundant formatting)
-                if character_profile.get('characterString'):
-                    character_string = character_profile.get('characterString')
-                else:
-                    # Check cache first (use character name as key)
-                    cache_key = char_name
-                    if cache_key in self._formatted_profile_cache:
-                        character_string = self._formatted_profile_cache[cache_key]
-                        logger.debug(f"Using cached formatted profile for '{char_name}'")
-                    else:
-                        # Format and cache
-                        character_string = format_character_profile(character_profile)
-                        self._formatted_profile_cache[cache_key] = character_string
-                        logger.debug(f"Formatted and cached profile for '{char_name}'")
+                # Profile parsing and PromptBuilder setup only depend on the
+                # profile contents, so turn N+1 with an unchanged profile reuses the same builder
+                profile_key = json.dumps(character_profile, sort_keys=True, default=str)
+                prompt_builder = _build_profile_prompt_builder(profile_key, char_name)
 
                 avoid_words = character_profile.get('avoidWords', [])
-                companion_type = character_profile.get('companionType', 'friend')
-
-                # Extract character metadata
-                character_gender = character_profile.get('gender', 'unknown')
-                character_role = character_profile.get('role', '')
-                character_backstory = character_profile.get('backstory', '')
-                tag_selections = character_profile.get('tagSelections', {})
-
-                # Extract character boundaries (string with newlines → list)
-                character_boundaries_str = character_profile.get('boundaries', '')
-                character_boundaries = [b.strip() for b in character_boundaries_str.split('\n') if b.strip() and b.strip() != '-']
-
-                # Extract additional character fields for identity chunks
-                character_species = character_profile.get('species', 'Human')
-                character_age = character_profile.get('age', 25)
-                character_interests = character_profile.get('interests', '')
-
-                # Extract user settings from character_profile (Node.js merged them in)
                 user_name = character_profile.get('user_name', character_profile.get('userName', 'User'))
-                user_gender = character_profile.get('user_gender', 'non-binary')
-                user_species = character_profile.get('user_species', 'human')
-                user_timezone = character_profile.get('user_timezone', 'UTC')
-                user_backstory = character_profile.get('user_backstory', '')
-                user_preferences = character_profile.get('user_preferences', {})
-                major_life_events = character_profile.get('user_major_life_events', [])
-                shared_roleplay_events = character_profile.get('shared_roleplay_events', [])
-                user_communication_boundaries = character_profile.get('user_communication_boundaries', '')
-
-                # Generate lorebook from tagSelections if they exist
-                lorebook = character_profile.get('lorebook', {})
-                if tag_selections and not lorebook:
-                    lorebook_generator = LorebookGenerator()
-                    lorebook = lorebook_generator.generate_lorebook_from_tags(
-                        character_name=char_name,
-                        companion_type=companion_type,
-                        selected_tags=tag_selections
-                    )
-                    logger.debug(f"Generated lorebook with {len(lorebook.get('chunks', []))} chunks")
-
-                # Create PromptBuilder directly from provided data
-                prompt_builder = PromptBuilder(
-                    character_profile=character_string,
-                    character_name=char_name,
-                    character_gender=character_gender,
-                    character_role=character_role,
-                    character_backstory=character_backstory,
-                    avoid_words=avoid_words,
-                    user_name=user_name,
-                    companion_type=companion_type,
-                    user_gender=user_gender,
-                    user_species=user_species,
-                    user_timezone=user_timezone,
-                    user_backstory=user_backstory,
-                    user_preferences=user_preferences,
-                    major_life_events=major_life_events,
-                    shared_roleplay_events=shared_roleplay_events,
-                    user_communication_boundaries=user_communication_boundaries,
-                    lorebook=lorebook,
-                    personality_tags=tag_selections,  # Pass the dict, not a list
-                    # V3 additions for identity chunks
-                    character_species=character_species,
-                    character_age=character_age,
-                    character_interests=character_interests,
-                    character_boundaries=character_boundaries
-                )
 
                 # Create ResponseCleaner with fresh avoid_words from Node.js (never cached)
                 response_cleaner = self._create_response_cleaner(char_name, user_name, avoid_words)
@@ -551,70 +863,29 @@ class LLMProcessor:
                 char_name = character_name or self.default_character_name
 
                 # Load character data to get avoid words
-                (_, _, avoid_words, user_name, *_) = self._load_character_data(char_name)
-                response_cleaner = self._create_response_cleaner(char_name, user_name, avoid_words)
-
-            # 1. Fetch memory context if not provided via search_context
-            memory_context = await self.context_manager.fetch_memory_context(
-                query=text,
-                character=char_name,
-                user_name=self.user_name,
-                enable_memory_override=enable_memory
-            )
+                character = self._load_character_data(char_name)
+                response_cleaner = self._create_response_cleaner(char_name, character.user_name, character.avoid_words)
 
-            # 2. Fetch web search context if not already provided and user enabled it
-            if not search_context:
-                # Detect if this is a conversation starter (don't search for starters)
-                is_starter = "[System: Generate a brief, natural conversation starter" in text
-                search_context = await self.context_manager.fetch_web_context(
-                    text=text,
-                    is_starter=is_starter,
-                    enable_web_search=enable_web_search,
-                    api_key=web_search_api_key
-                )
-
-            # 3. Build the complete prompt and get generation parameters
-            emotion = emotion_data.get('emotion', 'neutral') if emotion_data else 'neutral'
-            prompt, max_tokens, temperature = prompt_builder.build_prompt(
+            # Memory + web context, prompt, streamed generation and cleaning (shared with generate_response)
+            cleaned_response, tokens_generated = await self._run_plan(GenerationPlan(
+                prompt_builder=prompt_builder,
+                response_cleaner=response_cleaner,
                 text=text,
-                emotion=emotion,
                 conversation_history=conversation_history,
-                search_context=search_context,  # Use provided search context
+                emotion=emotion_data.get('emotion', 'neutral') if emotion_data else 'neutral',
                 emotion_data=emotion_data,
-                memory_context=memory_context
-            )
-
-            # Apply overrides if provided
-            if max_tokens_override:
-                max_tokens = max_tokens_override
-            if temperature_override is not None:
-                temperature = temperature_override
-
-            # Calculate approximate token count (chars / 4 is rough estimate)
-            approx_tokens = len(prompt) // 4
-            logger.info(f"Context-aware prompt: {len(prompt)} chars (~{approx_tokens} tokens)")
-            logger.info(f"Generation params: max_tokens={max_tokens}, temp={temperature}")
-
-            # Log prompt length only (not content)
-            logger.debug(f"Prompt length: {len(prompt)} chars")
-
-            # 5. Generate response from LLM
-            raw_response, tokens_generated = await self.llm_inference.generate(
-                prompt=prompt,
-                max_tokens=max_tokens,
-                temperature=temperature
-            )
-
-            # Check for cancellation after generation (before cleaning/returning)
-            if request_id:
-                from main import cancelled_requests
-                if request_id in cancelled_requests:
-                    logger.info(f"🚫 Request cancelled after generation (discarding result)")
-                    cancelled_requests.discard(request_id)
-                    raise RuntimeError("Request cancelled by client")
-
-            # 6. Clean the response
-            cleaned_response = response_cleaner.clean(raw_response, user_message=text)
+                context=self._fetch_context(
+                    text,
+                    char_name,
+                    search_context=search_context,  # Skips the web fetch when provided
+                    enable_memory=enable_memory,
+                    enable_web_search=enable_web_search,
+                    web_search_api_key=web_search_api_key
+                ),
+                max_tokens_override=max_tokens_override,
+                temperature_override=temperature_override,
+                cancel_event=cancel_event
+            ))
 
             logger.info(f"✅ Context-aware generation: {len(cleaned_response)} chars, {tokens_generated} tokens")
 
@@ -689,7 +960,8 @@ class LLMProcessor:
     def _get_response_cleaner_for_character(self, character_name: Optional[str] = None) -> ResponseCleaner:
         """
         Get ResponseCleaner for the specified character.
-        Avoid words are NEVER cached - always loaded fresh.
+        Cached alongside the character data it is built from, so clearing the
+        character cache also picks up edited avoid words.
 
         Args:
             character_name: Name of character, or None for default
@@ -697,12 +969,4 @@ class LLMProcessor:
         Returns:
             ResponseCleaner instance
         """
-        # Use default if no character specified
-        if not character_name:
-            character_name = self.default_character_name
-
-        # Load character data (cached, but avoid_words are always fresh)
-        (_, char_name, avoid_words, user_name, *_) = self._load_character_data(character_name)
-
-        # Create ResponseCleaner with fresh avoid_words (never cached)
-        return self._create_response_cleaner(char_name, user_name, avoid_words)
+        return _build_response_cleaner(character_name or self.default_character_name)
@@ -6,7 +6,7 @@ from typing import Dict, List, Any, Optional
 import logging
 import json
 
-from .lorebook_templates import LorebookTemplates
+from .lorebook_templates import LorebookTemplates, json_default
 
 logger = logging.getLogger(__name__)
 
@@ -60,28 +60,35 @@ class LorebookGenerator:
         tag_matched_count = 0
 
         # 2. For each category, get templates for selected tags
+        matched = {}  # template id -> (template, ui category); first selection wins
         for category, tags in selected_tags.items():
             for tag in tags:
-                template = self.templates.get_template_by_ui_tag(tag, category)
+                template_id = self.templates.get_template_id_by_ui_tag(tag, category)
+                template = self.templates.TEMPLATES.get(template_id) if template_id else None
                 if template:
-                    # V4 format: Templates have emotion_responses instead of static content
-                    # Pass the entire template structure for dynamic retrieval
-                    chunks.append({
-                        "id": template["id"],
-                        "category": template["category"],
-                        "priority": template["priority"],
-                        "tokens": template.get("tokens", 100),  # Average token estimate
-                        "triggers": template.get("triggers", {}),
-                        "emotion_responses": template.get("emotion_responses", {}),  # V4: emotion-specific responses
-                        "source": "tag_matched",
-                        "ui_tag": template.get("ui_tag"),
-                        "ui_category": category,
-                        "requires_selection": template.get("requires_selection", False)
-                    })
+                    matched.setdefault(template_id, (template, category))
                     tag_matched_count += 1
                 else:
                     logger.warning(f"No template found for tag '{tag}' in category '{category}'")
 
+        # Emit in the template library's precomputed priority order (one chunk per template)
+        for template_id in self.templates.sort_by_priority(matched):
+            template, category = matched[template_id]
+            # V4 format: Templates have emotion_responses instead of static content
+            # Pass the entire template structure for dynamic retrieval
+            chunks.append({
+                "id": template_id,
+                "category": template["category"],
+                "priority": template["priority"],
+                "tokens": template.get("tokens", 100),  # Average token estimate
+                "triggers": template.get("triggers", {}),
+                "emotion_responses": template.get("emotion_responses", {}),  # V4: emotion-specific responses
+                "source": "tag_matched",
+                "ui_tag": template.get("ui_tag"),
+                "ui_category": category,
+                "requires_selection": template.get("requires_selection", False)
+            })
+
         logger.debug(f"Matched {tag_matched_count} templates from {sum(len(tags) for tags in selected_tags.values())} tags")
 
         # 3. Add custom chunks (user-written)
@@ -166,7 +173,8 @@ class LorebookGenerator:
         Returns:
             Summary of emotion responses, or None if not found
         """
-        template = self.templates.get_template_by_ui_tag(ui_tag, category)
+        template_id = self.templates.get_template_id_by_ui_tag(ui_tag, category)
+        template = self.templates.TEMPLATES.get(template_id) if template_id else None
         if not template:
             return None
 
@@ -176,21 +184,17 @@ class LorebookGenerator:
             return "No emotion responses defined"
 
         # Get the default response as preview
-        default_response = emotion_responses.get("default", {})
+        default_response = self.templates.get_response(template_id, "default")
         if default_response:
-            tone = default_response.get("tone", "")
-            action = default_response.get("action", "")
-            preview = f"Tone: {tone}. Action: {action}"
+            preview = f"Tone: {default_response.tone}. Action: {default_response.action}"
             if len(preview) > 150:
                 return preview[:150] + "..."
             return preview
 
         # Otherwise show first available emotion
         first_emotion = next(iter(emotion_responses.keys()))
-        first_response = emotion_responses[first_emotion]
-        tone = first_response.get("tone", "")
-        action = first_response.get("action", "")
-        preview = f"[{first_emotion}] Tone: {tone}. Action: {action}"
+        first_response = self.templates.get_response(template_id, first_emotion)
+        preview = f"[{first_emotion}] Tone: {first_response.tone}. Action: {first_response.action}"
         if len(preview) > 150:
             return preview[:150] + "..."
         return preview
@@ -249,7 +253,7 @@ class LorebookGenerator:
         Returns:
             Formatted JSON string
         """
-        return json.dumps(lorebook, indent=2)
+        return json.dumps(lorebook, indent=2, default=json_default)
 
     def import_lorebook_json(self, json_str: str) -> Dict[str, Any]:
         """
@@ -7,11 +7,25 @@ Each tag has emotion-specific responses with:
 - Tone: How to sound/speak
 - Action: What behaviors to exhibit
 """
-from typing import Dict, Any, List
+import sys
+from types import MappingProxyType
+from typing import Dict, Any, Iterable, List, FrozenSet, NamedTuple, Optional, Tuple
+
+
+class EmotionResponse(NamedTuple):
+    """One tag's instruction for one emotion"""
+    tokens: int
+    tone: str
+    action: str
 
 
 class LorebookTemplates:
-    """RAG Instruction Chunks: Directly instruct the LLM on behavior, tone, and formatting."""
+    """
+    RAG Instruction Chunks: Directly instruct the LLM on behavior, tone, and formatting.
+
+    The library is read-only at runtime: after the lookup indexes are built, every dict level
+    is frozen into a MappingProxyType (lists into tuples), so callers can share it without copying.
+    """
 
     # Template chunks organized by category
     TEMPLATES: Dict[str, Dict[str, Any]] = {
@@ -21,7 +35,6 @@ class LorebookTemplates:
         # ═══════════════════════════════════════════════════════════
 
         "ee_warm": {
-            "id": "ee_warm",
             "category": "emotional_expression",
             "priority": 75,
             "ui_tag": "Warm",
@@ -106,7 +119,6 @@ class LorebookTemplates:
         },
 
         "ee_reserved": {
-            "id": "ee_reserved",
             "category": "emotional_expression",
             "priority": 75,
             "ui_tag": "Reserved",
@@ -176,7 +188,6 @@ class LorebookTemplates:
         },
 
         "ee_passionate": {
-            "id": "ee_passionate",
             "category": "emotional_expression",
             "priority": 90,
             "ui_tag": "Passionate",
@@ -251,7 +262,6 @@ class LorebookTemplates:
         },
 
         "ee_calm": {
-            "id": "ee_calm",
             "category": "emotional_expression",
             "priority": 75,
             "ui_tag": "Calm",
@@ -326,7 +336,6 @@ class LorebookTemplates:
         },
 
         "ee_stoic": {
-            "id": "ee_stoic",
             "category": "emotional_expression",
             "priority": 75,
             "ui_tag": "Stoic",
@@ -396,7 +405,6 @@ class LorebookTemplates:
         },
 
         "ee_sensitive": {
-            "id": "ee_sensitive",
             "category": "emotional_expression",
             "priority": 75,
             "ui_tag": "Sensitive",
@@ -471,7 +479,6 @@ class LorebookTemplates:
         },
 
         "ee_expressive": {
-            "id": "ee_expressive",
             "category": "emotional_expression",
             "priority": 90,
             "ui_tag": "Expressive",
@@ -546,7 +553,6 @@ class LorebookTemplates:
         },
 
         "ee_grumpy": {
-            "id": "ee_grumpy",
             "category": "emotional_expression",
             "priority": 75,
             "ui_tag": "Grumpy",
@@ -596,7 +602,6 @@ class LorebookTemplates:
         },
 
         "ee_volatile": {
-            "id": "ee_volatile",
             "category": "emotional_expression",
             "priority": 75,
             "ui_tag": "Volatile",
@@ -646,7 +651,6 @@ class LorebookTemplates:
         },
 
         "ee_abrasive": {
-            "id": "ee_abrasive",
             "category": "emotional_expression",
             "priority": 75,
             "ui_tag": "Abrasive",
@@ -700,7 +704,6 @@ class LorebookTemplates:
         # ═══════════════════════════════════════════════════════════
 
         "se_extroverted": {
-            "id": "se_extroverted",
             "category": "social_energy",
             "priority": 70,
             "ui_tag": "Extroverted",
@@ -745,7 +748,6 @@ class LorebookTemplates:
         },
 
         "se_introverted": {
-            "id": "se_introverted",
             "category": "social_energy",
             "priority": 70,
             "ui_tag": "Introverted",
@@ -790,7 +792,6 @@ class LorebookTemplates:
         },
 
         "se_friendly": {
-            "id": "se_friendly",
             "category": "social_energy",
             "priority": 70,
             "ui_tag": "Friendly",
@@ -835,7 +836,6 @@ class LorebookTemplates:
         },
 
         "se_selective": {
-            "id": "se_selective",
             "category": "social_energy",
             "priority": 70,
             "ui_tag": "Selective",
@@ -875,7 +875,6 @@ class LorebookTemplates:
         },
 
         "se_takes_initiative": {
-            "id": "se_takes_initiative",
             "category": "social_energy",
             "priority": 70,
             "ui_tag": "Takes Initiative",
@@ -915,7 +914,6 @@ class LorebookTemplates:
         },
 
         "se_supportive": {
-            "id": "se_supportive",
             "category": "social_energy",
             "priority": 70,
             "ui_tag": "Supportive",
@@ -960,7 +958,6 @@ class LorebookTemplates:
         },
 
         "se_independent": {
-            "id": "se_independent",
             "category": "social_energy",
             "priority": 70,
             "ui_tag": "Independent",
@@ -1000,7 +997,6 @@ class LorebookTemplates:
         },
 
         "se_surly": {
-            "id": "se_surly",
             "category": "social_energy",
             "priority": 70,
             "ui_tag": "Surly",
@@ -1054,7 +1050,6 @@ class LorebookTemplates:
         # ═══════════════════════════════════════════════════════════
 
         "ts_analytical": {
-            "id": "ts_analytical",
             "category": "thinking_style",
             "priority": 70,
             "ui_tag": "Analytical",
@@ -1094,7 +1089,6 @@ class LorebookTemplates:
         },
 
         "ts_creative": {
-            "id": "ts_creative",
             "category": "thinking_style",
             "priority": 70,
             "ui_tag": "Creative",
@@ -1129,7 +1123,6 @@ class LorebookTemplates:
         },
 
         "ts_wise": {
-            "id": "ts_wise",
             "category": "thinking_style",
             "priority": 70,
             "ui_tag": "Wise",
@@ -1169,7 +1162,6 @@ class LorebookTemplates:
         },
 
         "ts_curious": {
-            "id": "ts_curious",
             "category": "thinking_style",
             "priority": 70,
             "ui_tag": "Curious",
@@ -1209,7 +1201,6 @@ class LorebookTemplates:
         },
 
         "ts_observant": {
-            "id": "ts_observant",
             "category": "thinking_style",
             "priority": 70,
             "ui_tag": "Observant",
@@ -1244,7 +1235,6 @@ class LorebookTemplates:
         },
 
         "ts_philosophical": {
-            "id": "ts_philosophical",
             "category": "thinking_style",
             "priority": 70,
             "ui_tag": "Philosophical",
@@ -1279,7 +1269,6 @@ class LorebookTemplates:
         },
 
         "ts_pensive": {
-            "id": "ts_pensive",
             "category": "thinking_style",
             "priority": 70,
             "ui_tag": "Pensive",
@@ -1314,7 +1303,6 @@ class LorebookTemplates:
         },
 
         "ts_poetic": {
-            "id": "ts_poetic",
             "category": "thinking_style",
             "priority": 70,
             "ui_tag": "Poetic",
@@ -1354,7 +1342,6 @@ class LorebookTemplates:
         },
 
         "ts_practical": {
-            "id": "ts_practical",
             "category": "thinking_style",
             "priority": 70,
             "ui_tag": "Practical",
@@ -1398,7 +1385,6 @@ class LorebookTemplates:
         # ═══════════════════════════════════════════════════════════
 
         "he_witty": {
-            "id": "he_witty",
             "category": "humor_edge",
             "priority": 65,
             "ui_tag": "Witty",
@@ -1433,7 +1419,6 @@ class LorebookTemplates:
         },
 
         "he_sarcastic": {
-            "id": "he_sarcastic",
             "category": "humor_edge",
             "priority": 65,
             "ui_tag": "Sarcastic",
@@ -1468,7 +1453,6 @@ class LorebookTemplates:
         },
 
         "he_playful": {
-            "id": "he_playful",
             "category": "humor_edge",
             "priority": 65,
             "ui_tag": "Playful",
@@ -1503,7 +1487,6 @@ class LorebookTemplates:
         },
 
         "he_wry": {
-            "id": "he_wry",
             "category": "humor_edge",
             "priority": 65,
             "ui_tag": "Wry",
@@ -1533,7 +1516,6 @@ class LorebookTemplates:
         },
 
         "he_bold": {
-            "id": "he_bold",
             "category": "humor_edge",
             "priority": 65,
             "ui_tag": "Bold",
@@ -1568,7 +1550,6 @@ class LorebookTemplates:
         },
 
         "he_mysterious": {
-            "id": "he_mysterious",
             "category": "humor_edge",
             "priority": 65,
             "ui_tag": "Mysterious",
@@ -1603,7 +1584,6 @@ class LorebookTemplates:
         },
 
         "he_brooding": {
-            "id": "he_brooding",
             "category": "humor_edge",
             "priority": 65,
             "ui_tag": "Brooding",
@@ -1638,7 +1618,6 @@ class LorebookTemplates:
         },
 
         "he_lighthearted": {
-            "id": "he_lighthearted",
             "category": "humor_edge",
             "priority": 65,
             "ui_tag": "Lighthearted",
@@ -1678,7 +1657,6 @@ class LorebookTemplates:
         },
 
         "he_sharp_tongued": {
-            "id": "he_sharp_tongued",
             "category": "humor_edge",
             "priority": 70,
             "ui_tag": "Sharp-Tongued",
@@ -1732,7 +1710,6 @@ class LorebookTemplates:
         # ═══════════════════════════════════════════════════════════
 
         "cv_honest": {
-            "id": "cv_honest",
             "category": "core_values",
             "priority": 75,
             "ui_tag": "Honest",
@@ -1767,7 +1744,6 @@ class LorebookTemplates:
         },
 
         "cv_loyal": {
-            "id": "cv_loyal",
             "category": "core_values",
             "priority": 75,
             "ui_tag": "Loyal",
@@ -1807,7 +1783,6 @@ class LorebookTemplates:
         },
 
         "cv_courageous": {
-            "id": "cv_courageous",
             "category": "core_values",
             "priority": 75,
             "ui_tag": "Courageous",
@@ -1847,7 +1822,6 @@ class LorebookTemplates:
         },
 
         "cv_ambitious": {
-            "id": "cv_ambitious",
             "category": "core_values",
             "priority": 70,
             "ui_tag": "Ambitious",
@@ -1882,7 +1856,6 @@ class LorebookTemplates:
         },
 
         "cv_humble": {
-            "id": "cv_humble",
             "category": "core_values",
             "priority": 70,
             "ui_tag": "Humble",
@@ -1922,7 +1895,6 @@ class LorebookTemplates:
         },
 
         "cv_principled": {
-            "id": "cv_principled",
             "category": "core_values",
             "priority": 75,
             "ui_tag": "Principled",
@@ -1957,7 +1929,6 @@ class LorebookTemplates:
         },
 
         "cv_adventurous": {
-            "id": "cv_adventurous",
             "category": "core_values",
             "priority": 70,
             "ui_tag": "Adventurous",
@@ -1992,7 +1963,6 @@ class LorebookTemplates:
         },
 
         "cv_authentic": {
-            "id": "cv_authentic",
             "category": "core_values",
             "priority": 75,
             "ui_tag": "Authentic",
@@ -2027,7 +1997,6 @@ class LorebookTemplates:
         },
 
         "cv_justice_oriented": {
-            "id": "cv_justice_oriented",
             "category": "core_values",
             "priority": 75,
             "ui_tag": "Justice-Oriented",
@@ -2062,7 +2031,6 @@ class LorebookTemplates:
         },
 
         "cv_cynical": {
-            "id": "cv_cynical",
             "category": "core_values",
             "priority": 75,
             "ui_tag": "Cynical",
@@ -2116,7 +2084,6 @@ class LorebookTemplates:
         # ═══════════════════════════════════════════════════════════
 
         "htc_kind": {
-            "id": "htc_kind",
             "category": "how_they_care",
             "priority": 75,
             "ui_tag": "Kind",
@@ -2156,7 +2123,6 @@ class LorebookTemplates:
         },
 
         "htc_compassionate": {
-            "id": "htc_compassionate",
             "category": "how_they_care",
             "priority": 75,
             "ui_tag": "Compassionate",
@@ -2196,7 +2162,6 @@ class LorebookTemplates:
         },
 
         "htc_empathetic": {
-            "id": "htc_empathetic",
             "category": "how_they_care",
             "priority": 75,
             "ui_tag": "Empathetic",
@@ -2241,7 +2206,6 @@ class LorebookTemplates:
         },
 
         "htc_patient": {
-            "id": "htc_patient",
             "category": "how_they_care",
             "priority": 70,
             "ui_tag": "Patient",
@@ -2281,7 +2245,6 @@ class LorebookTemplates:
         },
 
         "htc_generous": {
-            "id": "htc_generous",
             "category": "how_they_care",
             "priority": 70,
             "ui_tag": "Generous",
@@ -2321,7 +2284,6 @@ class LorebookTemplates:
         },
 
         "htc_encouraging": {
-            "id": "htc_encouraging",
             "category": "how_they_care",
             "priority": 70,
             "ui_tag": "Encouraging",
@@ -2366,7 +2328,6 @@ class LorebookTemplates:
         },
 
         "htc_protective": {
-            "id": "htc_protective",
             "category": "how_they_care",
             "priority": 70,
             "ui_tag": "Protective",
@@ -2406,7 +2367,6 @@ class LorebookTemplates:
         },
 
         "htc_respectful": {
-            "id": "htc_respectful",
             "category": "how_they_care",
             "priority": 75,
             "ui_tag": "Respectful",
@@ -2446,7 +2406,6 @@ class LorebookTemplates:
         },
 
         "htc_nurturing": {
-            "id": "htc_nurturing",
             "category": "how_they_care",
             "priority": 70,
             "ui_tag": "Nurturing",
@@ -2495,7 +2454,6 @@ class LorebookTemplates:
         # ═══════════════════════════════════════════════════════════
 
         "ep_energetic": {
-            "id": "ep_energetic",
             "category": "energy_presence",
             "priority": 70,
             "ui_tag": "Energetic",
@@ -2530,7 +2488,6 @@ class LorebookTemplates:
         },
 
         "ep_confident": {
-            "id": "ep_confident",
             "category": "energy_presence",
             "priority": 70,
             "ui_tag": "Confident",
@@ -2565,7 +2522,6 @@ class LorebookTemplates:
         },
 
         "ep_assertive": {
-            "id": "ep_assertive",
             "category": "energy_presence",
             "priority": 70,
             "ui_tag": "Assertive",
@@ -2600,7 +2556,6 @@ class LorebookTemplates:
         },
 
         "ep_gentle": {
-            "id": "ep_gentle",
             "category": "energy_presence",
             "priority": 70,
             "ui_tag": "Gentle",
@@ -2640,7 +2595,6 @@ class LorebookTemplates:
         },
 
         "ep_steady": {
-            "id": "ep_steady",
             "category": "energy_presence",
             "priority": 70,
             "ui_tag": "Steady",
@@ -2675,7 +2629,6 @@ class LorebookTemplates:
         },
 
         "ep_dynamic": {
-            "id": "ep_dynamic",
             "category": "energy_presence",
             "priority": 70,
             "ui_tag": "Dynamic",
@@ -2710,7 +2663,6 @@ class LorebookTemplates:
         },
 
         "ep_intense": {
-            "id": "ep_intense",
             "category": "energy_presence",
             "priority": 70,
             "ui_tag": "Intense",
@@ -2750,7 +2702,6 @@ class LorebookTemplates:
         },
 
         "ep_easygoing": {
-            "id": "ep_easygoing",
             "category": "energy_presence",
             "priority": 70,
             "ui_tag": "Easygoing",
@@ -2789,7 +2740,6 @@ class LorebookTemplates:
         # ═══════════════════════════════════════════════════════════
 
         "li_outdoorsy": {
-            "id": "li_outdoorsy",
             "category": "lifestyle_interests",
             "priority": 65,
             "tokens": 70,
@@ -2801,7 +2751,6 @@ class LorebookTemplates:
         },
 
         "li_homebody": {
-            "id": "li_homebody",
             "category": "lifestyle_interests",
             "priority": 65,
             "tokens": 70,
@@ -2813,7 +2762,6 @@ class LorebookTemplates:
         },
 
         "li_romantic": {
-            "id": "li_romantic",
             "category": "lifestyle_interests",
             "priority": 65,
             "tokens": 70,
@@ -2825,7 +2773,6 @@ class LorebookTemplates:
         },
 
         "li_intellectual": {
-            "id": "li_intellectual",
             "category": "lifestyle_interests",
             "priority": 65,
             "tokens": 70,
@@ -2837,7 +2784,6 @@ class LorebookTemplates:
         },
 
         "li_artistic": {
-            "id": "li_artistic",
             "category": "lifestyle_interests",
             "priority": 65,
             "ui_tag": "Artistic",
@@ -2882,7 +2828,6 @@ class LorebookTemplates:
         },
 
         "li_active": {
-            "id": "li_active",
             "category": "lifestyle_interests",
             "priority": 65,
             "ui_tag": "Active",
@@ -2927,7 +2872,6 @@ class LorebookTemplates:
         },
 
         "li_contemplative": {
-            "id": "li_contemplative",
             "category": "lifestyle_interests",
             "priority": 65,
             "tokens": 70,
@@ -2939,7 +2883,6 @@ class LorebookTemplates:
         },
 
         "li_social": {
-            "id": "li_social",
             "category": "lifestyle_interests",
             "priority": 65,
             "tokens": 70,
@@ -2955,7 +2898,6 @@ class LorebookTemplates:
         # ═══════════════════════════════════════════════════════════
 
         "intimacy_none_platonic": {
-            "id": "intimacy_none_platonic",
             "category": "narrative_control",
             "priority": 100,
             "tokens": 150,
@@ -3013,7 +2955,6 @@ This is friendship. Period. Nothing more."""
         },
 
         "intimacy_minimal": {
-            "id": "intimacy_minimal",
             "category": "narrative_control",
             "priority": 105,
             "tokens": 90,
@@ -3028,7 +2969,6 @@ This is friendship. Period. Nothing more."""
         },
 
         "intimacy_sweet": {
-            "id": "intimacy_sweet",
             "category": "narrative_control",
             "priority": 105,
             "tokens": 90,
@@ -3043,7 +2983,6 @@ This is friendship. Period. Nothing more."""
         },
 
         "intimacy_passionate": {
-            "id": "intimacy_passionate",
             "category": "narrative_control",
             "priority": 105,
             "tokens": 90,
@@ -3058,7 +2997,6 @@ This is friendship. Period. Nothing more."""
         },
 
         "romance_slow_burn": {
-            "id": "romance_slow_burn",
             "category": "narrative_control",
             "priority": 85,
             "tokens": 80,
@@ -3073,7 +3011,6 @@ This is friendship. Period. Nothing more."""
         },
 
         "romance_natural": {
-            "id": "romance_natural",
             "category": "narrative_control",
             "priority": 85,
             "tokens": 80,
@@ -3088,7 +3025,6 @@ This is friendship. Period. Nothing more."""
         },
 
         "romance_immediate_chemistry": {
-            "id": "romance_immediate_chemistry",
             "category": "narrative_control",
             "priority": 85,
             "tokens": 80,
@@ -3103,7 +3039,6 @@ This is friendship. Period. Nothing more."""
         },
 
         "scene_fade_to_black": {
-            "id": "scene_fade_to_black",
             "category": "narrative_control",
             "priority": 90,
             "tokens": 80,
@@ -3118,7 +3053,6 @@ This is friendship. Period. Nothing more."""
         },
 
         "scene_implied": {
-            "id": "scene_implied",
             "category": "narrative_control",
             "priority": 90,
             "tokens": 80,
@@ -3133,7 +3067,6 @@ This is friendship. Period. Nothing more."""
         },
 
         "scene_descriptive": {
-            "id": "scene_descriptive",
             "category": "narrative_control",
             "priority": 90,
             "tokens": 80,
@@ -3148,7 +3081,6 @@ This is friendship. Period. Nothing more."""
         },
 
         "initiation_character_leads": {
-            "id": "initiation_character_leads",
             "category": "narrative_control",
             "priority": 95,
             "tokens": 150,
@@ -3170,7 +3102,6 @@ This is friendship. Period. Nothing more."""
         },
 
         "initiation_you_lead": {
-            "id": "initiation_you_lead",
             "category": "narrative_control",
             "priority": 85,
             "tokens": 100,
@@ -3192,7 +3123,6 @@ This is friendship. Period. Nothing more."""
         },
 
         "initiation_mutual": {
-            "id": "initiation_mutual",
             "category": "narrative_control",
             "priority": 85,
             "tokens": 110,
@@ -3214,7 +3144,6 @@ This is friendship. Period. Nothing more."""
         },
 
         "initiation_ask_first": {
-            "id": "initiation_ask_first",
             "category": "narrative_control",
             "priority": 90,
             "tokens": 120,
@@ -3245,7 +3174,6 @@ This is friendship. Period. Nothing more."""
         # ═══════════════════════════════════════════════════════════
 
         "friendship_casual": {
-            "id": "friendship_casual",
             "category": "platonic_style",
             "priority": 80,
             "tokens": 80,
@@ -3260,7 +3188,6 @@ This is friendship. Period. Nothing more."""
         },
 
         "friendship_close": {
-            "id": "friendship_close",
             "category": "platonic_style",
             "priority": 80,
             "tokens": 80,
@@ -3275,7 +3202,6 @@ This is friendship. Period. Nothing more."""
         },
 
         "friendship_mentor_mentee": {
-            "id": "friendship_mentor_mentee",
             "category": "platonic_style",
             "priority": 80,
             "tokens": 80,
@@ -3290,7 +3216,6 @@ This is friendship. Period. Nothing more."""
         },
 
         "friendship_adventure_buddies": {
-            "id": "friendship_adventure_buddies",
             "category": "platonic_style",
             "priority": 80,
             "tokens": 80,
@@ -3305,7 +3230,6 @@ This is friendship. Period. Nothing more."""
         },
 
         "friendship_intellectual_companions": {
-            "id": "friendship_intellectual_companions",
             "category": "platonic_style",
             "priority": 80,
             "tokens": 80,
@@ -3320,7 +3244,6 @@ This is friendship. Period. Nothing more."""
         },
 
         "conversation_intellectual_engagement": {
-            "id": "conversation_intellectual_engagement",
             "category": "dialogue_style",
             "priority": 82,
             "tokens": 180,
@@ -3369,7 +3292,6 @@ Engage deeply on ideas WITHOUT losing your character's voice. Be thoughtful AND
         },
 
         "conversation_supportive_friend": {
-            "id": "conversation_supportive_friend",
             "category": "dialogue_style",
             "priority": 85,
             "tokens": 200,
@@ -3435,7 +3357,6 @@ When they share problems or emotions, be supportive WITHOUT losing your personal
         },
 
         "conversation_humor_and_wit": {
-            "id": "conversation_humor_and_wit",
             "category": "dialogue_style",
             "priority": 75,
             "tokens": 160,
@@ -3493,7 +3414,6 @@ If your character is witty/funny/sassy, SHOW IT. Humor keeps conversations engag
         },
 
         "platonic_touch_no_touch": {
-            "id": "platonic_touch_no_touch",
             "category": "platonic_style",
             "priority": 90,
             "tokens": 80,
@@ -3508,7 +3428,6 @@ If your character is witty/funny/sassy, SHOW IT. Humor keeps conversations engag
         },
 
         "platonic_touch_reserved": {
-            "id": "platonic_touch_reserved",
             "category": "platonic_style",
             "priority": 80,
             "tokens": 70,
@@ -3523,7 +3442,6 @@ If your character is witty/funny/sassy, SHOW IT. Humor keeps conversations engag
         },
 
         "platonic_touch_friendly": {
-            "id": "platonic_touch_friendly",
             "category": "platonic_style",
             "priority": 80,
             "tokens": 70,
@@ -3538,7 +3456,6 @@ If your character is witty/funny/sassy, SHOW IT. Humor keeps conversations engag
         },
 
         "platonic_touch_affectionate": {
-            "id": "platonic_touch_affectionate",
             "category": "platonic_style",
             "priority": 80,
             "tokens": 70,
@@ -3553,7 +3470,6 @@ If your character is witty/funny/sassy, SHOW IT. Humor keeps conversations engag
         },
 
         "dialogue_natural_conversation": {
-            "id": "dialogue_natural_conversation",
             "category": "dialogue_style",
             "priority": 85,
             "tokens": 200,
@@ -3618,7 +3534,6 @@ If your character is witty/funny/sassy, SHOW IT. Humor keeps conversations engag
         # ═══════════════════════════════════════════════════════════
 
         "identity_character": {
-            "id": "identity_character",
             "category": "core_identity",
             "priority": 100,
             "tokens": 100,
@@ -3629,7 +3544,6 @@ If your character is witty/funny/sassy, SHOW IT. Humor keeps conversations engag
         },
 
         "identity_user": {
-            "id": "identity_user",
             "category": "core_identity",
             "priority": 100,
             "tokens": 80,
@@ -3640,7 +3554,6 @@ If your character is witty/funny/sassy, SHOW IT. Humor keeps conversations engag
         },
 
         "companion_type_romantic": {
-            "id": "companion_type_romantic",
             "category": "core_identity",
             "priority": 100,
             "tokens": 60,
@@ -3658,7 +3571,6 @@ You and {user_name} are in a romantic relationship. Act accordingly:
         },
 
         "user_boundaries": {
-            "id": "user_boundaries",
             "category": "core_identity",
             "priority": 95,
             "tokens": 50,
@@ -3787,9 +3699,9 @@ You and {user_name} are in a romantic relationship. Act accordingly:
     }
 
     @classmethod
-    def get_template_by_ui_tag(cls, ui_tag: str, category: str = None) -> Dict[str, Any]:
+    def get_template_id_by_ui_tag(cls, ui_tag: str, category: str = None) -> Optional[str]:
         """
-        Get a template by its UI display name.
+        Get a template ID by its UI display name.
         Category helps disambiguate tags with same name (e.g., "Reserved" in different contexts)
         """
         # Handle ambiguous tags based on category context
@@ -3809,22 +3721,217 @@ You and {user_name} are in a romantic relationship. Act accordingly:
             else:
                 template_id = "ee_passionate"
         else:
-            template_id = cls.TAG_TO_TEMPLATE_ID.get(ui_tag)
+            template_id = TAG_TO_TEMPLATE_ID.get(ui_tag)
+
+        return template_id
 
+    @classmethod
+    def get_template_by_ui_tag(cls, ui_tag: str, category: str = None) -> Dict[str, Any]:
+        """
+        Get a template by its UI display name.
+        Templates do not carry their own ID - use get_template_id_by_ui_tag() when the ID is needed.
+        """
+        template_id = cls.get_template_id_by_ui_tag(ui_tag, category)
         if not template_id:
             return None
 
-        return cls.TEMPLATES.get(template_id)
+        return TEMPLATES.get(template_id)
+
+    @classmethod
+    def get_response(cls, tag: str, emotion: str) -> Optional[EmotionResponse]:
+        """
+        Get a template's emotion response, falling back to its default response.
+
+        Args:
+            tag: Template ID (e.g., "ee_warm")
+            emotion: Emotion label (e.g., "sadness"); unknown labels use the default response
+
+        Returns:
+            EmotionResponse, or None if the template has no matching or default response
+        """
+        return get_response(tag, emotion)
+
+    @classmethod
+    def sort_by_priority(cls, tags: Iterable[str]) -> List[str]:
+        """
+        Order template IDs by priority (highest first) using the order precomputed at import.
+
+        Args:
+            tags: Template IDs (duplicates and unknown IDs are dropped)
+
+        Returns:
+            Template IDs, highest priority first
+        """
+        selected = set(tags)
+        return [tag for tag in _BY_PRIORITY if tag in selected]
 
     @classmethod
     def get_all_templates(cls) -> Dict[str, Dict[str, Any]]:
         """Get all templates"""
-        return cls.TEMPLATES
+        return TEMPLATES
 
     @classmethod
     def get_templates_by_category(cls, category: str) -> List[Dict[str, Any]]:
         """Get all templates in a specific category"""
-        return [
-            template for template in cls.TEMPLATES.values()
-            if template.get("category") == category
-        ]
+        return [TEMPLATES[tag] for tag in _BY_CATEGORY.get(category, ())]
+
+
+# ═══════════════════════════════════════════════════════════
+# FLAT RESPONSE INDEX: (tag, emotion) → EmotionResponse
+# ═══════════════════════════════════════════════════════════
+
+def _validate_templates(templates: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Check the template library's shape once at import, so the index builders and lookups below can
+    index fields directly instead of guarding every access.
+
+    Raises:
+        ValueError: If a template or one of its emotion responses is malformed
+    """
+    for tag, template in templates.items():
+        if not isinstance(template.get("category"), str):
+            raise ValueError(f"Template '{tag}' needs a string category")
+        if not isinstance(template.get("priority"), int):
+            raise ValueError(f"Template '{tag}' needs an integer priority")
+        if not isinstance(template.get("ui_tag", ""), str):
+            raise ValueError(f"Template '{tag}' ui_tag must be a string")
+        if not isinstance(template.get("requires_selection", False), bool):
+            raise ValueError(f"Template '{tag}' requires_selection must be a bool")
+
+        if "emotion_responses" not in template:
+            if not isinstance(template.get("content"), str):
+                raise ValueError(f"Template '{tag}' needs emotion_responses or string content")
+            continue
+
+        responses = template["emotion_responses"]
+        if "default" not in responses:
+            raise ValueError(f"Template '{tag}' has emotion_responses but no default response")
+        for emotion, response in responses.items():
+            if not (
+                isinstance(response.get("tokens"), int)
+                and isinstance(response.get("tone"), str)
+                and isinstance(response.get("action"), str)
+            ):
+                raise ValueError(f"Template '{tag}' response '{emotion}' needs int tokens and string tone/action")
+
+
+def _build_index(
+    templates: Dict[str, Dict[str, Any]]
+) -> Tuple[Dict[Tuple[str, str], EmotionResponse], FrozenSet[str]]:
+    """
+    Flatten TEMPLATES[tag]["emotion_responses"][emotion] into a single (tag, emotion)-keyed dict.
+    TEMPLATES stays the source of truth (generated lorebooks share its structures).
+
+    Repeated tone/action/category/ui_tag strings are canonicalized through one pool and
+    written back into TEMPLATES, so the source dicts and the index share a single copy.
+    Identical responses collapse into one shared EmotionResponse.
+
+    Returns:
+        (flat response index, set of tags that have emotion responses)
+    """
+    pool: Dict[str, str] = {}
+
+    def canonical(value: str) -> str:
+        return pool.setdefault(value, sys.intern(value))
+
+    records: Dict[EmotionResponse, EmotionResponse] = {}
+    flat = {}
+    for tag, template in templates.items():
+        for field in ("category", "ui_tag"):
+            if field in template:
+                template[field] = canonical(template[field])
+
+        for emotion, response in template.get("emotion_responses", {}).items():
+            response["tone"] = canonical(response["tone"])
+            response["action"] = canonical(response["action"])
+
+            # Shape checked by _validate_templates()
+            record = EmotionResponse(tokens=response["tokens"], tone=response["tone"], action=response["action"])
+            # Flyweight: equal (tokens, tone, action) triples share one instance, so `is` works for dedup
+            flat[(sys.intern(tag), sys.intern(emotion))] = records.setdefault(record, record)
+    return flat, frozenset(tag for tag, _ in flat)
+
+
+_validate_templates(LorebookTemplates.TEMPLATES)
+_FLAT, _TAGS = _build_index(LorebookTemplates.TEMPLATES)
+
+# Priorities are static: template IDs highest-priority first (stable within a priority)
+_BY_PRIORITY: Tuple[str, ...] = tuple(
+    sorted(LorebookTemplates.TEMPLATES, key=lambda tag: -LorebookTemplates.TEMPLATES[tag]["priority"])
+)
+
+# Category → template IDs (template order), so a category filter is one tuple fetch instead of a scan
+_BY_CATEGORY: Dict[str, Tuple[str, ...]] = {}
+for _tag, _template in LorebookTemplates.TEMPLATES.items():
+    _category = _template["category"]
+    _BY_CATEGORY[_category] = _BY_CATEGORY.get(_category, ()) + (_tag,)
+del _tag, _template, _category
+
+# Dense tag ids: each template ID gets a row index in the response table below
+_TAG_NAMES: Tuple[str, ...] = tuple(sys.intern(tag) for tag in LorebookTemplates.TEMPLATES)
+
+
+# Fixed emotion ordering (default last) shared by every (tag, emotion) table below
+_EMOTION_NAMES: Tuple[str, ...] = tuple(dict.fromkeys(
+    [emotion for _, emotion in _FLAT if emotion != "default"] + ["default"]
+))
+_EMOTION_ID: Dict[str, int] = {emotion: emotion_id for emotion_id, emotion in enumerate(_EMOTION_NAMES)}
+_EMOTION_COUNT = len(_EMOTION_NAMES)
+_DEFAULT_EMOTION_ID = _EMOTION_ID["default"]
+
+# Response table: one cell per (tag, emotion) at tag_id * _EMOTION_COUNT + emotion_id.
+# Emotions a tag has no response for are filled with its default response at build time, so lookups
+# never branch on a miss. Cells stay None only for content-only tags (no emotion responses).
+_DEFAULT_RESP: List[Optional[EmotionResponse]] = [_FLAT.get((tag, "default")) for tag in _TAG_NAMES]
+_TABLE: List[Optional[EmotionResponse]] = [None] * (len(_TAG_NAMES) * _EMOTION_COUNT)
+for _row, _tag in enumerate(_TAG_NAMES):
+    for _column, _emotion in enumerate(_EMOTION_NAMES):
+        _response = _FLAT.get((_tag, _emotion)) or _DEFAULT_RESP[_row]
+        if _response is not None:
+            _TABLE[_row * _EMOTION_COUNT + _column] = _response
+del _row, _tag, _column, _emotion, _response
+
+# Per-tag rows of _TABLE, specialized once so a lookup is one probe by tag and one tuple index by emotion
+_ROWS: Dict[str, Tuple[Optional[EmotionResponse], ...]] = {
+    tag: tuple(_TABLE[tag_id * _EMOTION_COUNT:(tag_id + 1) * _EMOTION_COUNT]) for tag_id, tag in enumerate(_TAG_NAMES)
+}
+
+
+def get_response(tag: str, emotion: str) -> Optional[EmotionResponse]:
+    """Module-level LorebookTemplates.get_response - defaults are pre-filled, so there is no fallback path"""
+    row = _ROWS.get(tag)
+    return row[_EMOTION_ID.get(emotion, _DEFAULT_EMOTION_ID)] if row is not None else None
+
+
+# The flat dict and the staging table are build-only: lookups read _ROWS from here on. Changing
+# templates at runtime (e.g. loading an edited library) therefore needs a module reload rather than
+# an in-place edit.
+del _FLAT, _TABLE
+
+
+# ═══════════════════════════════════════════════════════════
+# FREEZE: the library is read-only once the indexes above are built
+# ═══════════════════════════════════════════════════════════
+
+def _freeze(value: Any) -> Any:
+    """Recursively wrap dicts in MappingProxyType (with interned string keys) and turn lists into tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({
+            sys.intern(key) if isinstance(key, str) else key: _freeze(item) for key, item in value.items()
+        })
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def json_default(value: Any) -> Any:
+    """json.dump(s) default= hook for lorebooks that share frozen template structures"""
+    if isinstance(value, MappingProxyType):
+        return dict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+# Module-level bindings: hot paths (and the classmethods above) read these as plain globals
+# instead of going through class attribute lookup
+TEMPLATES = LorebookTemplates.TEMPLATES = _freeze(LorebookTemplates.TEMPLATES)
+TAG_TO_TEMPLATE_ID = LorebookTemplates.TAG_TO_TEMPLATE_ID = _freeze(LorebookTemplates.TAG_TO_TEMPLATE_ID)
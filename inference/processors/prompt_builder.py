@@ -4,13 +4,23 @@ Strips out emotion context, romantic/platonic variance, empathy model, and sycop
 Keeps only: Character/User Cards, Personality, Response Format, Safety Protocols, Current Context, Conversation History
 """
 import logging
-import re
 from datetime import datetime
 import pytz
 from typing import List, Dict, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Conversation starter requests always begin with this system instruction
+STARTER_PREFIX = "[System: Generate a brief, natural conversation starter"
+
+# Generation params as (max_tokens, temperature)
+RESPONSE_PARAMS = (400, 1.0)  # Fixed temperature and tokens for regular turns
+STARTER_PARAMS = (120, 1.0)  # Concise openers, standard creativity
+KAIROS_STARTER_PARAMS = (150, 0.75)  # Calm and measured for Kairos
+
+# Only the most recent turns of conversation history go into the prompt
+MAX_HISTORY_TURNS = 8
+
 
 class PromptBuilder:
     """Builds minimal LLM prompts from character and user profiles."""
@@ -62,9 +72,15 @@ class PromptBuilder:
         self.companion_type = companion_type
         self.personality_tags = personality_tags or {}
 
-        # Response cleaner patterns
+        # Avoid words (listed in the prompt; removal is done by the ResponseCleaner's shared pattern)
         self.avoid_words = avoid_words or []
-        self.avoid_patterns = [re.compile(re.escape(p), re.IGNORECASE) for p in self.avoid_words]
+
+        # Static prompt prefix (built lazily, reused every turn)
+        self._prefix: Optional[str] = None
+
+        # Per-character constants, resolved once instead of on every turn
+        self.is_kairos = self.character_name.lower() == 'kairos'
+        self._starter_params = KAIROS_STARTER_PARAMS if self.is_kairos else STARTER_PARAMS
 
     def _get_time_context(self) -> str:
         """Get current time context based on user's timezone."""
@@ -103,17 +119,23 @@ class PromptBuilder:
 
     def _build_context(self, conversation_history: List[Dict]) -> str:
         """Build conversation history - last 4 exchanges (8 messages)."""
-        if not conversation_history:
-            return ""
-        recent = conversation_history[-8:]
         parts = []
-        for turn in recent:
+        self._build_context_into(parts, conversation_history)
+        return "\n".join(parts)
+
+    def _build_context_into(self, parts: List[str], conversation_history: List[Dict]) -> int:
+        """Append conversation history lines (last MAX_HISTORY_TURNS messages) to parts; returns how many were added."""
+        if not conversation_history:
+            return 0
+        added = 0
+        for turn in conversation_history[-MAX_HISTORY_TURNS:]:
             role = turn.get('role') or turn.get('speaker')
             text = (turn.get('content') or turn.get('text', '')).strip()
             speaker = self.character_name if role in ('assistant', 'character') else self.user_name
             if text:
                 parts.append(f"{speaker}: {text}")
-        return "\n".join(parts)
+                added += 1
+        return added
 
 
     def _build_character_info(self) -> str:
@@ -248,7 +270,7 @@ class PromptBuilder:
 
     def _build_kairos_instructions(self) -> str:
         """Build Kairos-specific wellness instructions."""
-        if self.character_name.lower() != 'kairos':
+        if not self.is_kairos:
             return ""
 
         return f"""**[KAIROS WELLNESS]**
@@ -263,12 +285,12 @@ Create a wellness-centered space in every response:
 
     def _build_starter_requirements(self, text: str) -> str:
         """Build conversation starter requirements if this is a starter prompt."""
-        is_starter = "[System: Generate a brief, natural conversation starter" in text
+        is_starter = text.startswith(STARTER_PREFIX)
         if not is_starter:
             return ""
 
         # KAIROS STARTER: Wellness-focused
-        if self.character_name.lower() == 'kairos':
+        if self.is_kairos:
             return f"""**[CONVERSATION STARTER REQUIREMENTS]**
 Generate a brief wellness-focused greeting that:
 - Opens with a calming presence cue (e.g., "(takes a slow, deep breath)", "(settles into a quiet moment)")
@@ -300,8 +322,15 @@ Example: "*grins* Hey {self.user_name}! Good to see you. How are you?"
 Example: "*waves* There you are! How is your day?"
  """
 
-    def _build_prompt(self, text: str, conversation_history: List[Dict], emotion_data: Optional[Dict] = None) -> str:
-        """Build minimal prompt with only core formatting sections - no emotion/empathy/romantic variance."""
+    def build_prefix(self) -> str:
+        """
+        Build the static part of the prompt (cards, personality, format, safety).
+
+        It depends only on the character/user profile, so it is built once per builder and is
+        byte-identical across turns - llama.cpp can then reuse its KV cache for the whole prefix.
+        """
+        if self._prefix is not None:
+            return self._prefix
 
         # Character and user info
         character_info = self._build_character_info()
@@ -310,13 +339,7 @@ Example: "*waves* There you are! How is your day?"
         # Personality and special instructions
         personality_instructions = self._build_personality_instructions()
         kairos_instructions = self._build_kairos_instructions()
-        starter_requirements = self._build_starter_requirements(text)
-
-        # Context
-        time_context = self._get_time_context()
-        conversation_context = self._build_context(conversation_history)
 
-        # Build prompt
         parts = []
         parts.append("**[CHARACTER CARD]**")
         parts.append(character_info)
@@ -333,10 +356,6 @@ Example: "*waves* There you are! How is your day?"
             parts.append(kairos_instructions)
             parts.append("")
 
-        if starter_requirements:
-            parts.append(starter_requirements)
-            parts.append("")
-
         # Response format instructions
         parts.append("**[RESPONSE FORMAT]**")
         parts.append(f"Actions: *asterisks*. Dialogue: plain text. Example: *grins* Let's go. Keep it 1-3 sentences, natural and casual. Never end conversation unless {self.user_name} says goodbye. NEVER include meta-commentary, 'Explanation:', or internal tags. First person only.")
@@ -359,14 +378,32 @@ Example: "*waves* There you are! How is your day?"
         parts.append('"This is a roleplay interface. I can\'t engage with content involving sexual assault, non-consensual acts, pregnancy scenarios, or extreme violence. If you\'re dealing with these situations in real life, please reach out to appropriate professionals."')
         parts.append("")
 
+        self._prefix = "\n".join(parts) + "\n"
+        return self._prefix
+
+    def _build_suffix(self, text: str, conversation_history: List[Dict]) -> str:
+        """Build the per-turn part of the prompt (starter rules, time, history, user input)."""
+        starter_requirements = self._build_starter_requirements(text)
+
+        # Context
+        time_context = self._get_time_context()
+
+        # Every section (history lines included) goes into one list, joined exactly once
+        parts = []
+
+        if starter_requirements:
+            parts.append(starter_requirements)
+            parts.append("")
+
         parts.append("**[CURRENT CONTEXT]**")
         parts.append(time_context)
         parts.append("")
 
-        if conversation_context:
-            parts.append("**[CONVERSATION HISTORY]**")
-            parts.append(conversation_context)
+        parts.append("**[CONVERSATION HISTORY]**")
+        if self._build_context_into(parts, conversation_history):
             parts.append("")
+        else:
+            parts.pop()  # No history - drop the header
 
         parts.append(f"**[USER INPUT]**\n{self.user_name}: {text}")
         parts.append("")
@@ -374,6 +411,35 @@ Example: "*waves* There you are! How is your day?"
 
         return "\n".join(parts)
 
+    def _build_prompt(self, text: str, conversation_history: List[Dict], emotion_data: Optional[Dict] = None) -> str:
+        """Build minimal prompt with only core formatting sections - no emotion/empathy/romantic variance."""
+        return self.build_prefix() + self._build_suffix(text, conversation_history)
+
+    def build_prompt_parts(
+        self,
+        text: str,
+        conversation_history: List[Dict],
+        emotion_data: Optional[Dict] = None,
+        **kwargs  # Accept unused params for backward compatibility
+    ) -> Tuple[str, str, int, float]:
+        """
+        Build the prompt as a static prefix plus a per-turn suffix.
+
+        Returns:
+            Tuple of (prefix, suffix, max_tokens, temperature) - prefix + suffix is the full prompt
+        """
+        prefix = self.build_prefix()
+        suffix = self._build_suffix(text, conversation_history)
+
+        # CONVERSATION STARTER DETECTION: starters get shorter params (Kairos: calmer ones)
+        is_starter_prompt = text.startswith(STARTER_PREFIX)
+        max_tokens, temperature = self._starter_params if is_starter_prompt else RESPONSE_PARAMS
+
+        # Generation params for debugging (lazy - nothing is formatted unless DEBUG is on)
+        logger.debug("TEMPERATURE: %s | MAX_TOKENS: %s | IS_STARTER: %s", temperature, max_tokens, is_starter_prompt)
+
+        return prefix, suffix, max_tokens, temperature
+
     def build_prompt(
         self,
         text: str,
@@ -387,32 +453,5 @@ Example: "*waves* There you are! How is your day?"
         Returns:
             Tuple of (prompt, max_tokens, temperature)
         """
-        prompt = self._build_prompt(text, conversation_history, emotion_data)
-
-        # Fixed temperature and tokens
-        temperature = 1.0
-        max_tokens = 400
-
-        # CONVERSATION STARTER DETECTION: Adjust params for starter messages
-        is_starter_prompt = "[System: Generate a brief, natural conversation starter" in text
-        if is_starter_prompt:
-            max_tokens = 120  # Concise openers
-            temperature = 1.0  # Standard creativity
-
-            # KAIROS STARTER: Wellness-focused conversation starter
-            if self.character_name.lower() == 'kairos':
-                temperature = 0.75  # Calm and measured for Kairos
-                max_tokens = 150
-
-        # Output raw prompt to console for debugging
-        print("=" * 80)
-        #print("RAW PROMPT BEING SENT TO LLM:")
-        print("=" * 80)
-        #print(prompt)
-        print("=" * 80)
-        print(f"TEMPERATURE: {temperature}")
-        print(f"MAX_TOKENS: {max_tokens}")
-        #print(f"IS_STARTER: {is_starter_prompt}")
-        print("=" * 80)
-
-        return prompt, max_tokens, temperature
+        prefix, suffix, max_tokens, temperature = self.build_prompt_parts(text, conversation_history, emotion_data)
+        return prefix + suffix, max_tokens, temperature
@@ -4,10 +4,191 @@ Handles all text cleaning and post-processing of LLM outputs
 """
 import re
 import logging
+from typing import Optional, Pattern, Union, Iterable, Iterator, List, Tuple
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:  # Optional dependency - avoid words fall back to a compiled regex alternation
+    ahocorasick = None
+    AHOCORASICK_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
 
+def _is_word_char(char: str) -> bool:
+    """Same notion of a word character as regex \\w"""
+    return char.isalnum() or char == '_'
+
+
+class _Span:
+    """Minimal match object (start()/end()) returned by AhoCorasickAvoidMatcher.finditer"""
+
+    __slots__ = ("_start", "_end")
+
+    def __init__(self, start: int, end: int):
+        self._start = start
+        self._end = end
+
+    def start(self) -> int:
+        return self._start
+
+    def end(self) -> int:
+        return self._end
+
+
+class AhoCorasickAvoidMatcher:
+    """
+    Literal avoid-phrase matcher backed by a pyahocorasick automaton.
+
+    Drop-in for the compiled avoid alternation (finditer/sub) with the same semantics:
+    case-insensitive, \\b word boundaries on alphanumeric phrase edges, leftmost match
+    first and the longest phrase at a given position wins. The text is scanned once by
+    the automaton instead of the regex engine trying every alternative at every position.
+    """
+
+    def __init__(self, phrases: Iterable[str], fallback: Pattern):
+        """
+        Args:
+            phrases: Stripped, non-empty avoid words/phrases
+            fallback: Equivalent regex alternation, used for the rare text whose length changes when lowercased
+        """
+        self.fallback = fallback
+        self.automaton = ahocorasick.Automaton()
+        for phrase in phrases:
+            lowered = phrase.lower()
+            # Value: (length, needs leading boundary, needs trailing boundary)
+            self.automaton.add_word(lowered, (len(lowered), phrase[0].isalnum(), phrase[-1].isalnum()))
+        self.automaton.make_automaton()
+
+    def _spans(self, text: str, pos: int) -> List[Tuple[int, int]]:
+        """Non-overlapping (start, end) spans at or after pos, leftmost-longest"""
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # A few characters change length when lowercased, which would shift offsets
+            return [(match.start(), match.end()) for match in self.fallback.finditer(text, pos)]
+
+        candidates = []
+        for last, (length, lead_boundary, trail_boundary) in self.automaton.iter(lowered):
+            start = last - length + 1
+            end = last + 1
+            if start < pos:
+                continue
+            if lead_boundary and start > 0 and _is_word_char(text[start - 1]):
+                continue
+            if trail_boundary and end < len(text) and _is_word_char(text[end]):
+                continue
+            candidates.append((start, -length))
+
+        spans = []
+        resume = pos
+        for start, neg_length in sorted(candidates):
+            if start >= resume:
+                spans.append((start, start - neg_length))
+                resume = start - neg_length
+        return spans
+
+    def finditer(self, text: str, pos: int = 0) -> Iterator[_Span]:
+        """Yield matches (leftmost first) starting at or after pos"""
+        for start, end in self._spans(text, pos):
+            yield _Span(start, end)
+
+    def sub(self, repl: str, text: str) -> str:
+        """Replace every match with repl"""
+        out = []
+        pos = 0
+        for start, end in self._spans(text, 0):
+            out.append(text[pos:start])
+            out.append(repl)
+            pos = end
+        out.append(text[pos:])
+        return "".join(out)
+
+
+# Compiled regex alternation, or the Aho-Corasick matcher for larger phrase lists
+AvoidPattern = Union[Pattern, AhoCorasickAvoidMatcher]
+
+
+class AvoidStreamFilter:
+    """
+    Incrementally removes avoid words/phrases from streamed LLM output.
+
+    Only the last few characters (enough to hold the longest phrase plus one for the
+    word-boundary check) are buffered; everything before that is filtered and released
+    as soon as it arrives. One instance per generation - it carries per-stream state.
+    """
+
+    __slots__ = ("pattern", "holdback", "_pending", "_prev")
+
+    def __init__(self, pattern: Optional[AvoidPattern], max_phrase_len: int):
+        """
+        Args:
+            pattern: Compiled avoid alternation (None = pass-through)
+            max_phrase_len: Length of the longest avoid phrase
+        """
+        self.pattern = pattern
+        self.holdback = max_phrase_len + 1
+        self._pending = ""
+        self._prev = ""  # Last raw character already released (word-boundary context)
+
+    def feed(self, chunk: str) -> str:
+        """
+        Add a streamed chunk and return whatever text is now safe to emit
+
+        Args:
+            chunk: Newly generated text
+
+        Returns:
+            Filtered text (may be empty while a possible match is still buffered)
+        """
+        if self.pattern is None:
+            return chunk
+
+        # Prefix the previous raw character so \b at the buffer start matches like the full text
+        pending = self._prev + self._pending + chunk
+        start = len(self._prev)
+        cut = len(pending) - self.holdback
+        if cut <= start:
+            self._pending = pending[start:]
+            return ""
+
+        # Emit up to the cut, never splitting a match; matches are found on the whole
+        # buffer so word boundaries at the cut see the following character
+        out = []
+        pos = start
+        for match in self.pattern.finditer(pending, start):
+            if match.start() >= cut:
+                break
+            if match.end() > cut:
+                cut = match.start()
+                break
+            out.append(pending[pos:match.start()])
+            pos = match.end()
+        out.append(pending[pos:cut])
+
+        if cut > start:
+            self._prev = pending[cut - 1]
+        self._pending = pending[cut:]
+        return "".join(out)
+
+    def flush(self) -> str:
+        """Filter and return the buffered tail at end of stream"""
+        pending, self._pending = self._pending, ""
+        if self.pattern is None:
+            return pending
+        start = len(self._prev)
+        text = self._prev + pending
+        self._prev = ""
+
+        out = []
+        pos = start
+        for match in self.pattern.finditer(text, start):
+            out.append(text[pos:match.start()])
+            pos = match.end()
+        out.append(text[pos:])
+        return "".join(out)
+
+
 class ResponseCleaner:
     """Cleans and post-processes LLM-generated text"""
 
@@ -350,18 +531,25 @@ class ResponseCleaner:
         re.IGNORECASE
     )
 
-    def __init__(self, character_name: str, user_name: str, avoid_patterns: list):
+    def __init__(self, character_name: str, user_name: str, avoid_pattern: Optional[AvoidPattern] = None,
+                 avoid_max_len: int = 0):
         """
         Initialize cleaner with character-specific settings
 
         Args:
             character_name: Name of the character
             user_name: Name of the user
-            avoid_patterns: List of compiled regex patterns to remove
+            avoid_pattern: Compiled avoid alternation or Aho-Corasick matcher for words/phrases to remove (optional)
+            avoid_max_len: Length of the longest avoid phrase (sizes the streaming buffer)
         """
         self.character_name = character_name
         self.user_name = user_name
-        self.avoid_patterns = avoid_patterns
+        self.avoid_pattern = avoid_pattern
+        self.avoid_max_len = avoid_max_len
+
+    def stream_filter(self) -> AvoidStreamFilter:
+        """Create a per-generation filter that strips avoid words while tokens stream in"""
+        return AvoidStreamFilter(self.avoid_pattern, self.avoid_max_len)
 
     @staticmethod
     def _remove_duplicates(text: str) -> str:
@@ -689,10 +877,10 @@ class ResponseCleaner:
         # Clean up again
         text = text.strip()
 
-        # Remove avoid words/phrases
-        if self.avoid_patterns:
-            for pattern in self.avoid_patterns:
-                text = pattern.sub('', text)
+        # Remove avoid words/phrases - always runs here, after the structural passes, even when a
+        # stream_filter() already stripped the raw stream (those passes can re-expose a phrase)
+        if self.avoid_pattern is not None:
+            text = self.avoid_pattern.sub('', text)
 
         # Clean up multiple spaces and fix spacing around punctuation
         text = self.WHITESPACE_PATTERN.sub(' ', text)
@@ -0,0 +1,61 @@
+"""
+Generation slot scheduling in LLMInference
+
+Run from inference/: python -m unittest discover -s tests -t .
+"""
+import asyncio
+import unittest
+
+try:
+    from processors.llm_inference import LLMInference
+except ImportError:  # llama-cpp-python not installed
+    LLMInference = None
+
+
+@unittest.skipIf(LLMInference is None, "llama-cpp-python is not installed")
+class SlotSchedulingTest(unittest.IsolatedAsyncioTestCase):
+    """No model is loaded - only the event-loop side of the slot is exercised"""
+
+    def setUp(self):
+        self.inference = LLMInference("unused.gguf")
+
+    def tearDown(self):
+        self.inference._executor.shutdown(wait=False)
+
+    async def test_release_skips_waiter_cancelled_while_queued(self):
+        inference = self.inference
+        await inference._acquire_slot()
+        cancelled = asyncio.create_task(inference._acquire_slot())
+        live = asyncio.create_task(inference._acquire_slot())
+        await asyncio.sleep(0)  # Both are now queued behind the holder
+
+        cancelled.cancel()
+        inference._release_slot()
+
+        with self.assertRaises(asyncio.CancelledError):
+            await cancelled
+        await asyncio.wait_for(live, timeout=1)
+        self.assertTrue(inference._slot_busy)
+        self.assertEqual(inference._slot_waiters, [])
+
+        inference._release_slot()
+        self.assertFalse(inference._slot_busy)
+
+    async def test_release_frees_slot_when_only_waiter_was_cancelled(self):
+        inference = self.inference
+        await inference._acquire_slot()
+        cancelled = asyncio.create_task(inference._acquire_slot())
+        await asyncio.sleep(0)
+
+        cancelled.cancel()
+        inference._release_slot()
+
+        with self.assertRaises(asyncio.CancelledError):
+            await cancelled
+        self.assertFalse(inference._slot_busy)
+        await asyncio.wait_for(inference._acquire_slot(), timeout=1)
+        self.assertTrue(inference._slot_busy)
+
+
+if __name__ == "__main__":
+    unittest.main()